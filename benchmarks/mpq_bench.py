@@ -0,0 +1,281 @@
+"""
+MPQ subsystem benchmarks on synthetic archives (no WoW client needed).
+
+Run from the repository root:
+    python -m benchmarks.mpq_bench --output results.json
+    python -m benchmarks.mpq_bench --quick --scenario zlib-4k --backend native --backend mpyq
+    python -m benchmarks.mpq_bench --compare base.json results.json
+
+Each scenario generates a client layout (benchmarks.mpq_synth) in a temporary directory and measures
+MpqManager initialize (cold and from the index cache), read_file miss/hit latency, search_files
+latency and index memory, and bulk read throughput. Results are written as JSON so runs on
+different commits can be compared with --compare.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+from benchmarks.mpq_synth import build_client
+from src.core.mpq_manager import MpqManager
+
+RESULTS_VERSION = 1
+
+SCENARIOS = [
+    {"name": "zlib-4k", "file_count": 2000, "sector_shift": 3, "compression": "zlib"},
+    {"name": "zlib-32k", "file_count": 2000, "sector_shift": 6, "compression": "zlib"},
+    {"name": "zlib-single", "file_count": 2000, "sector_shift": 3, "compression": "zlib", "single_unit": True},
+    {"name": "bzip2-4k", "file_count": 1000, "sector_shift": 3, "compression": "bzip2"},
+    {"name": "stored", "file_count": 2000, "sector_shift": 3, "compression": "none"},
+    {"name": "patched", "file_count": 2000, "sector_shift": 3, "compression": "zlib", "patches": 3},
+    {"name": "index-50k", "file_count": 50000, "sector_shift": 3, "compression": "zlib", "patches": 2,
+     "size_profile": "tiny"},
+]
+
+SEARCH_QUERIES = ["dragon", "murloc1", ".m2", "world\\maps", "_42.blp", "kalimdor7\\kalimdor7", "nomatch_zzz"]
+
+# Metrics where a larger value is better; everything else is a latency, size or time.
+HIGHER_IS_BETTER = {"bulk_mb_per_sec"}
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _fresh_manager(backend: str) -> MpqManager:
+    """Drops the MpqManager singleton so every measurement starts from a cold instance."""
+    MpqManager._instance = None
+    manager = MpqManager()
+    manager.set_backend(backend)
+    return manager
+
+
+def _timed_initialize(client_path: str, backend: str) -> Tuple[MpqManager, float]:
+    manager = _fresh_manager(backend)
+    start = time.perf_counter()
+    manager.initialize(client_path)
+    return manager, time.perf_counter() - start
+
+
+def run_scenario(scenario: Dict, backend: str, work_dir: str, reads: int = 500, repeat: int = 5) -> Dict:
+    """
+    Builds one scenario's archives under work_dir and returns its metrics.
+    Whole-operation timings (initialize, bulk) are the best of repeat runs.
+    """
+    params = {k: v for k, v in scenario.items() if k != "name"}
+    client_path = os.path.join(work_dir, "client")
+
+    start = time.perf_counter()
+    expected = build_client(client_path, **params)
+    build_seconds = time.perf_counter() - start
+    archive_bytes = sum(os.path.getsize(os.path.join(root, f))
+                        for root, _, files in os.walk(client_path) for f in files)
+
+    metrics = {"files": len(expected), "archive_mb": round(archive_bytes / (1024 * 1024), 2),
+               "build_seconds": round(build_seconds, 3)}
+
+    # Initialize: cold (no index cache), then warm (restored from the cache the cold run wrote)
+    cold = []
+    for _ in range(repeat):
+        if os.path.exists(MpqManager.INDEX_CACHE_FILE):
+            os.remove(MpqManager.INDEX_CACHE_FILE)
+        cold.append(_timed_initialize(client_path, backend)[1])
+    warm = [_timed_initialize(client_path, backend)[1] for _ in range(repeat)]
+    metrics["init_cold_ms"] = round(min(cold) * 1000, 2)
+    metrics["init_warm_ms"] = round(min(warm) * 1000, 2)
+    manager = MpqManager()
+
+    # read_file: first read of a path is a miss, the second one is served from the LRU cache
+    rng = random.Random(7)
+    sample = rng.sample(sorted(expected), min(reads, len(expected)))
+    miss_times = []
+    hit_times = []
+    errors = 0
+    for name in sample:
+        start = time.perf_counter()
+        data = manager.read_file(name)
+        miss_times.append(time.perf_counter() - start)
+        if data is None or data != expected[name]:
+            errors += 1
+    for name in sample:
+        start = time.perf_counter()
+        manager.read_file(name)
+        hit_times.append(time.perf_counter() - start)
+    metrics["read_miss_p50_us"] = round(_percentile(miss_times, 50) * 1e6, 1)
+    metrics["read_miss_p95_us"] = round(_percentile(miss_times, 95) * 1e6, 1)
+    metrics["read_hit_p50_us"] = round(_percentile(hit_times, 50) * 1e6, 2)
+    metrics["read_hit_p95_us"] = round(_percentile(hit_times, 95) * 1e6, 2)
+
+    # search_files: the first query builds the search index
+    start = time.perf_counter()
+    manager.search_files(SEARCH_QUERIES[0])
+    metrics["search_first_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    search_times = []
+    for _ in range(3):
+        for query in SEARCH_QUERIES:
+            start = time.perf_counter()
+            manager.search_files(query)
+            search_times.append(time.perf_counter() - start)
+    metrics["search_p50_ms"] = round(_percentile(search_times, 50) * 1000, 3)
+    metrics["search_p95_ms"] = round(_percentile(search_times, 95) * 1000, 3)
+
+    # Bulk throughput with the LRU cache disabled, in on-disk order
+    manager.set_cache_budget(0)
+    bulk_times = []
+    for _ in range(max(1, repeat // 2)):
+        total_bytes = 0
+        start = time.perf_counter()
+        for name, data in manager.iter_files(list(expected)):
+            if data is None:
+                errors += 1
+                continue
+            total_bytes += len(data)
+        bulk_times.append(time.perf_counter() - start)
+    bulk = min(bulk_times)
+    metrics["bulk_seconds"] = round(bulk, 3)
+    metrics["bulk_mb_per_sec"] = round(total_bytes / (1024 * 1024) / bulk, 2) if bulk > 0 else 0.0
+    metrics["read_errors"] = errors
+
+    # Memory (separate pass, tracemalloc slows everything down): cold index, then search structures
+    os.remove(MpqManager.INDEX_CACHE_FILE)
+    tracemalloc.start()
+    manager = _fresh_manager(backend)
+    manager.initialize(client_path)
+    metrics["index_kb"] = tracemalloc.get_traced_memory()[0] // 1024
+    before = tracemalloc.get_traced_memory()[0]
+    manager.search_files(SEARCH_QUERIES[0])
+    metrics["search_index_kb"] = (tracemalloc.get_traced_memory()[0] - before) // 1024
+    tracemalloc.stop()
+
+    MpqManager._instance = None
+    return metrics
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios: List[Dict], backends: List[str], quick: bool = False) -> Dict:
+    results = []
+    repo_dir = os.getcwd()
+    for scenario in scenarios:
+        if quick:
+            scenario = dict(scenario, file_count=max(100, scenario["file_count"] // 10))
+        for backend in backends:
+            work_dir = tempfile.mkdtemp(prefix="mpq_bench_")
+            try:
+                # INDEX_CACHE_FILE is relative to the working directory
+                os.chdir(work_dir)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    metrics = run_scenario(scenario, backend, work_dir)
+            finally:
+                os.chdir(repo_dir)
+                shutil.rmtree(work_dir, ignore_errors=True)
+            print(f"{scenario['name']:<12} {backend:<7} " +
+                  " ".join(f"{k}={v}" for k, v in metrics.items()), file=sys.stderr)
+            results.append({"scenario": scenario["name"], "backend": backend,
+                            "params": {k: v for k, v in scenario.items() if k != "name"},
+                            "metrics": metrics})
+
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": numpy_version,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(base: Dict, new: Dict, threshold: float = 0.10) -> int:
+    """
+    Prints per-metric changes between two result files and returns the number of regressions
+    (metrics more than threshold worse). Size/bookkeeping metrics are listed but never flagged.
+    """
+    informational = {"files", "archive_mb", "build_seconds", "read_errors"}
+    base_results = {(r["scenario"], r["backend"]): r["metrics"] for r in base["results"]}
+    regressions = 0
+    print(f"base {base['meta'].get('commit')}  ->  new {new['meta'].get('commit')}")
+    for result in new["results"]:
+        key = (result["scenario"], result["backend"])
+        old_metrics = base_results.get(key)
+        if old_metrics is None:
+            print(f"{key[0]} [{key[1]}]: no baseline")
+            continue
+        print(f"{key[0]} [{key[1]}]")
+        for metric, value in result["metrics"].items():
+            old = old_metrics.get(metric)
+            if old is None or metric in informational:
+                continue
+            change = (value - old) / old if old else 0.0
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif worse < -threshold:
+                flag = "  improved"
+            print(f"  {metric:<20} {old:>12} -> {value:>12} ({change:+.1%}){flag}")
+        if result["metrics"].get("read_errors"):
+            print(f"  read_errors          {result['metrics']['read_errors']}  REGRESSION")
+            regressions += 1
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MPQ subsystem on synthetic archives.")
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--scenario", action="append", help="run only these scenarios (repeatable)")
+    parser.add_argument("--backend", action="append", choices=["native", "mpyq"],
+                        help="archive backends to measure (repeatable, default: native)")
+    parser.add_argument("--quick", action="store_true", help="divide file counts by 10")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s["name"] in args.scenario]
+    if not scenarios:
+        parser.error(f"unknown scenario; choose from {', '.join(s['name'] for s in SCENARIOS)}")
+    results = run(scenarios, args.backend or ["native"], args.quick)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Synthetic MPQ archives for the benchmarks (format v0, as read by MpqReader / mpyq).
+Writes the encrypted hash and block tables, sector offset tables and a (listfile),
+so archives exercise the same paths as a real 3.3.5a client.
+"""
+import bz2
+import os
+import random
+import struct
+import zlib
+from typing import Dict, List, Optional
+from src.utils.mpq_crypto import CRYPT_TABLE, HASH_TABLE_OFFSET, HASH_A, HASH_B, HASH_TABLE_KEY, hash_string
+from src.utils.mpq_reader import (MPQ_FILE_COMPRESS, MPQ_FILE_SINGLE_UNIT, MPQ_FILE_EXISTS,
+                                  COMPRESSION_ZLIB, COMPRESSION_BZIP2, BytesLike)
+
+COMPRESSIONS = ("zlib", "bzip2", "none")
+SIZE_PROFILES = ("mixed", "tiny")
+
+_HEADER = struct.Struct('<4sIIHHIIII')
+_HASH_ENTRY = struct.Struct('<IIHHI')
+_BLOCK_ENTRY = struct.Struct('<IIII')
+_EMPTY = 0xFFFFFFFF
+
+
+def encrypt_table(data: bytes, key: int) -> bytes:
+    """Inverse of mpq_reader.decrypt_table."""
+    values = struct.unpack(f'<{len(data) // 4}I', data)
+    seed1 = key
+    seed2 = 0xEEEEEEEE
+    out = []
+    for value in values:
+        seed2 = (seed2 + CRYPT_TABLE[0x400 + (seed1 & 0xFF)]) & 0xFFFFFFFF
+        out.append((value ^ (seed1 + seed2)) & 0xFFFFFFFF)
+        seed1 = (((~seed1 << 0x15) + 0x11111111) | (seed1 >> 0x0B)) & 0xFFFFFFFF
+        seed2 = (value + seed2 + (seed2 << 5) + 3) & 0xFFFFFFFF
+    return struct.pack(f'<{len(out)}I', *out)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    """Returns the compressed unit with its mask byte, or data itself if compression does not help."""
+    # Fast compression levels: the reader does not care, and generation time adds up.
+    if compression == "zlib":
+        packed = bytes([COMPRESSION_ZLIB]) + zlib.compress(data, 1)
+    elif compression == "bzip2":
+        packed = bytes([COMPRESSION_BZIP2]) + bz2.compress(data, 1)
+    else:
+        return data
+    return packed if len(packed) < len(data) else bytes(data)
+
+
+def write_mpq(path: str, files: Dict[str, BytesLike], sector_shift: int = 3, compression: str = "zlib",
+              single_unit: bool = False, listfile: bool = True):
+    """
+    Writes files (internal path -> contents) to a new archive at path.
+    compression is one of COMPRESSIONS; "none" stores files uncompressed.
+    single_unit compresses each file as one unit instead of per sector.
+    """
+    files = dict(files)
+    if listfile:
+        files['(listfile)'] = '\r\n'.join(files).encode('utf-8')
+
+    sector_size = 512 << sector_shift
+    body = bytearray()
+    blocks = []
+    for name, data in files.items():
+        offset = _HEADER.size + len(body)
+        if compression == "none" or not data:
+            body += data
+            blocks.append((offset, len(data), len(data), MPQ_FILE_EXISTS | MPQ_FILE_SINGLE_UNIT))
+        elif single_unit:
+            packed = _compress(data, compression)
+            body += packed
+            blocks.append((offset, len(packed), len(data),
+                           MPQ_FILE_EXISTS | MPQ_FILE_COMPRESS | MPQ_FILE_SINGLE_UNIT))
+        else:
+            sectors = [_compress(data[i:i + sector_size], compression) for i in range(0, len(data), sector_size)]
+            position = 4 * (len(sectors) + 1)
+            table = []
+            for sector in sectors:
+                table.append(position)
+                position += len(sector)
+            table.append(position)
+            chunk = struct.pack(f'<{len(table)}I', *table) + b''.join(sectors)
+            body += chunk
+            blocks.append((offset, len(chunk), len(data), MPQ_FILE_EXISTS | MPQ_FILE_COMPRESS))
+
+    hash_size = 1
+    while hash_size < len(files) * 2:
+        hash_size *= 2
+    hash_table = [(_EMPTY, _EMPTY, 0xFFFF, 0xFFFF, _EMPTY)] * hash_size
+    for block_index, name in enumerate(files):
+        slot = hash_string(name, HASH_TABLE_OFFSET) & (hash_size - 1)
+        while hash_table[slot][4] != _EMPTY:
+            slot = (slot + 1) & (hash_size - 1)
+        hash_table[slot] = (hash_string(name, HASH_A), hash_string(name, HASH_B), 0, 0, block_index)
+
+    hash_raw = b''.join(_HASH_ENTRY.pack(*entry) for entry in hash_table)
+    block_raw = b''.join(_BLOCK_ENTRY.pack(*block) for block in blocks)
+    hash_offset = _HEADER.size + len(body)
+    block_offset = hash_offset + len(hash_raw)
+    archive_size = block_offset + len(block_raw)
+    header = _HEADER.pack(b'MPQ\x1a', _HEADER.size, archive_size, 0, sector_shift,
+                          hash_offset, block_offset, hash_size, len(blocks))
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        f.write(body)
+        f.write(encrypt_table(hash_raw, hash_string('(hash table)', HASH_TABLE_KEY)))
+        f.write(encrypt_table(block_raw, hash_string('(block table)', HASH_TABLE_KEY)))
+
+
+class PayloadSource:
+    """
+    Semi-compressible file contents: zero-copy slices of a pool mixing repeated tokens and
+    random bytes (roughly 2:1 with zlib, like typical client assets).
+    """
+
+    def __init__(self, seed: int = 0, pool_size: int = 4 * 1024 * 1024):
+        self.rng = random.Random(seed)
+        words = [bytes(self.rng.getrandbits(8) for _ in range(self.rng.randint(4, 12))) for _ in range(256)]
+        pool = bytearray()
+        while len(pool) < pool_size:
+            if self.rng.random() < 0.5:
+                pool += self.rng.choice(words)
+            else:
+                pool += self.rng.randbytes(8)
+        self.pool = memoryview(bytes(pool))
+
+    def take(self, size: int) -> memoryview:
+        size = min(size, len(self.pool))
+        start = self.rng.randrange(0, len(self.pool) - size + 1)
+        return self.pool[start:start + size]
+
+    def file_size(self, profile: str = "mixed") -> int:
+        """
+        "mixed": mostly small files (1-16 KB), some medium (16-128 KB), a few above the
+        parallel-inflate threshold (512 KB-1 MB). "tiny": 64-512 bytes, for index-bound runs.
+        """
+        if profile == "tiny":
+            return self.rng.randint(64, 512)
+        roll = self.rng.random()
+        if roll < 0.80:
+            return self.rng.randint(1024, 16 * 1024)
+        if roll < 0.98:
+            return self.rng.randint(16 * 1024, 128 * 1024)
+        return self.rng.randint(512 * 1024, 1024 * 1024)
+
+
+def make_names(count: int, seed: int = 0) -> List[str]:
+    """Client-like internal paths (Creature\\Name\\Name_NN.ext, World\\Maps\\..., Textures\\...)."""
+    rng = random.Random(seed)
+    roots = ["Creature", "Character", "Item\\ObjectComponents\\Weapon", "World\\Maps", "World\\Generic",
+             "Textures", "Spells", "Interface\\Icons", "Sound\\Creature", "DBFilesClient"]
+    exts = [".m2", ".skin", ".blp", ".adt", ".wmo", ".wav", ".dbc"]
+    names = set()
+    while len(names) < count:
+        folder = f"{rng.choice(roots)}\\{rng.choice(['Dragon', 'Murloc', 'Orc', 'Azeroth', 'Kalimdor', 'Misc'])}" \
+                 f"{rng.randint(0, count // 20)}"
+        names.add(f"{folder}\\{folder.rsplit(chr(92), 1)[1]}_{rng.randint(0, 99):02d}{rng.choice(exts)}")
+    return sorted(names)
+
+
+def build_client(root: str, file_count: int, sector_shift: int = 3, compression: str = "zlib",
+                 patches: int = 0, patch_fraction: float = 0.1, single_unit: bool = False,
+                 size_profile: str = "mixed", locale: Optional[str] = "enUS",
+                 seed: int = 0) -> Dict[str, memoryview]:
+    """
+    Writes a client layout under root/Data: common.MPQ with most files, locale-<locale>.MPQ
+    with the DBCs, and patches overlay archives (patch.MPQ, patch-2.MPQ, ...) that each
+    replace patch_fraction of the files and add a few new ones.
+    Returns the contents every path should read as (patch winners applied).
+    """
+    data_path = os.path.join(root, "Data")
+    os.makedirs(data_path, exist_ok=True)
+    source = PayloadSource(seed)
+    rng = random.Random(seed + 1)
+
+    names = make_names(file_count, seed)
+    expected = {name: source.take(source.file_size(size_profile)) for name in names}
+
+    base = {n: d for n, d in expected.items() if not (locale and n.startswith("DBFilesClient"))}
+    write_mpq(os.path.join(data_path, "common.MPQ"), base, sector_shift, compression, single_unit)
+    if locale:
+        locale_path = os.path.join(data_path, locale)
+        os.makedirs(locale_path, exist_ok=True)
+        dbcs = {n: d for n, d in expected.items() if n.startswith("DBFilesClient")}
+        write_mpq(os.path.join(locale_path, f"locale-{locale}.MPQ"), dbcs, sector_shift, compression, single_unit)
+
+    for i in range(patches):
+        patch_name = "patch.MPQ" if i == 0 else f"patch-{i + 1}.MPQ"
+        overlay = {}
+        for name in rng.sample(names, max(1, int(len(names) * patch_fraction))):
+            overlay[name] = source.take(source.file_size(size_profile))
+        for j in range(max(1, file_count // 100)):
+            overlay[f"Patch{i + 1}\\New\\File_{j:04d}.blp"] = source.take(source.file_size(size_profile))
+        write_mpq(os.path.join(data_path, patch_name), overlay, sector_shift, compression, single_unit)
+        expected.update(overlay)
+    return expected
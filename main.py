@@ -7,7 +7,7 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setApplicationName("AzerothForge")
     
-    # Initialize Data Manager (Start loading in bg ideally, but main thread ok for now)
+    # Initialize Data Manager (DBCs load in the background; widgets wait for the tables they need)
     DataManager()
     
     window = MainWindow()
@@ -13,6 +13,10 @@ class ConfigManager:
         "auth_service_name": "authserver",
         "client_data_path": "",
         "wow_client_path": "",
+        "mpq_cache_mb": 64,
+        "mpq_backend": "native",
+        "mpq_parallel_threshold_kb": 256,
+        "mpq_listfile": "",
         "auth_database": {
             "host": "localhost",
             "port": 3306,
@@ -58,6 +62,14 @@ class ConfigManager:
                     loaded["client_data_path"] = self.DEFAULT_CONFIG["client_data_path"]
                 if "wow_client_path" not in loaded:
                     loaded["wow_client_path"] = self.DEFAULT_CONFIG["wow_client_path"]
+                if "mpq_cache_mb" not in loaded:
+                    loaded["mpq_cache_mb"] = self.DEFAULT_CONFIG["mpq_cache_mb"]
+                if "mpq_backend" not in loaded:
+                    loaded["mpq_backend"] = self.DEFAULT_CONFIG["mpq_backend"]
+                if "mpq_parallel_threshold_kb" not in loaded:
+                    loaded["mpq_parallel_threshold_kb"] = self.DEFAULT_CONFIG["mpq_parallel_threshold_kb"]
+                if "mpq_listfile" not in loaded:
+                    loaded["mpq_listfile"] = self.DEFAULT_CONFIG["mpq_listfile"]
                 if "active_realm_index" not in loaded:
                     loaded["active_realm_index"] = self.DEFAULT_CONFIG["active_realm_index"]
                 if "playerbots_enabled" not in loaded:
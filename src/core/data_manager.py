@@ -1,9 +1,39 @@
+import multiprocessing
 import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
 from src.core.config_manager import ConfigManager
+from src.core.mpq_manager import MpqManager
+from src.utils.column_store import ColumnStore
+from src.utils.dbc_cache import DBCCache, file_source
 from src.utils.dbc_parser import DBCParser
+from src.utils.display_store import DisplayInfoStore
+from src.utils.search_index import ModelSearchIndex, NameSearchIndex, SearchHit, SearchService
+
+# Tables DataManager exposes as attributes; each gets a readiness future per load.
+TABLES = ("factions", "model_data", "display_infos", "maps", "spells")
+# Tables covered by DataManager.search(), in the order that breaks ties between equally good matches.
+SEARCH_TABLES = ("factions", "maps", "display_infos", "spells")
+
+# Tables read from a single DBC: DBC name -> (attribute, DBCParser reader, value column, log label).
+# display_infos is derived from two DBCs and spells is column-projected; both are loaded separately.
+DBC_TABLES = {
+    "Faction": ("factions", "read_faction_dbc", "name", "Factions"),
+    "CreatureModelData": ("model_data", "read_creature_model_data_dbc", "path", "Model Data entries"),
+    "Map": ("maps", "read_map_dbc", "name", "Maps"),
+}
+
+
+def _parse_dbc(reader: str, source) -> dict:
+    """Parse job: DBCParser().<reader>(source). Module level so process pool workers can run it."""
+    return getattr(DBCParser(), reader)(source)
 
 class DataManager:
     _instance = None
+    # Cold loads parsing at least this much DBC data use a process pool
+    PARALLEL_PARSE_BYTES = 8 * 1024 * 1024
     
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -17,112 +47,388 @@ class DataManager:
         
         self.config_manager = ConfigManager()
         self.parser = DBCParser()
+        # Parsed tables are cached under data/; a warm start does not parse any DBC.
+        self.cache = DBCCache()
+        # Where the current load reads DBCs from (set by load_data)
+        self.client_path = ""
+        self.mpq = None
+        # Cache name -> sources (DBC fingerprints) the loaded table was built from.
+        # A reload skips every table whose sources are unchanged.
+        self.sources: Dict[str, list] = {}
         
         self.factions = {}
         self.factions = {}
-        self.display_infos = {} # Merged ID -> {'model': path, 'texture': skin}
+        self.display_infos = DisplayInfoStore() # Merged ID -> {'model': path, 'texture': skin}, array-backed
         self.maps = {}
         self.model_data = {} # Raw ModelID -> Path
+        self.model_index = ModelSearchIndex(self.display_infos) # Built once per load of display_infos
+        self.spells = ColumnStore() # Spell.dbc, SPELL_FIELDS only
+        self.spell_index = self._spell_index(self.spells)
+        # Search over SEARCH_TABLES; each table's index is swapped in as soon as the table loads
+        self.search_service = SearchService()
+        for name in SEARCH_TABLES:
+            self._update_search(name)
         
-        # Load immediately or wait?
-        # User says "Method load_data()... Check client_data_path... If valid parse..."
-        # So we can call load_data explicitly or here.
-        # Let's call it here but wrap in try/catch or just be safe.
-        self.load_data()
+        # Load in the background so the UI can paint immediately; widgets wait on
+        # table_future() (or src.ui.components.data_loader.DataTableWatcher) for the tables they need.
+        self._executor = None
+        self._futures: Dict[str, Future] = {}
+        self.load_async()
+
+    # --- Async API ---
+
+    def load_async(self) -> Future:
+        """
+        Runs load_data() on the background worker. Every table gets a new readiness future,
+        resolved with the table as soon as it is loaded (or with its current contents if it is skipped).
+        """
+        futures = {name: Future() for name in TABLES}
+        self._futures = futures
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dbc-load")
+        return self._executor.submit(self._load_background, futures)
+
+    def table_future(self, name: str) -> Future:
+        """Future of the latest load of table name (one of TABLES). Result: the table."""
+        return self._futures[name]
 
-    def load_data(self):
+    def is_ready(self, name: str) -> bool:
+        return self._futures[name].done()
+
+    def wait_for(self, name: str, timeout: Optional[float] = None):
+        """Blocks until table name is loaded and returns it."""
+        return self._futures[name].result(timeout)
+
+    def _load_background(self, futures: Dict[str, Future]):
+        try:
+            self.load_data(futures)
+        except Exception as e:
+            print(f"ERROR: Background DBC load failed: {e}")
+        finally:
+            # Nobody waits forever, whatever happened to the individual tables
+            for name in TABLES:
+                self._publish(futures, name)
+
+    def _publish(self, futures: Optional[Dict[str, Future]], name: str):
+        if futures is None:
+            return
+        future = futures[name]
+        if not future.done():
+            future.set_result(getattr(self, name))
+
+    def load_data(self, futures: Optional[Dict[str, Future]] = None):
+        """
+        Loads every table synchronously. futures (from load_async) are resolved table by table.
+        Reloads are incremental: a table is only re-read if one of its DBCs changed or now comes
+        from a different file or archive; display infos are only re-merged if CreatureDisplayInfo
+        or CreatureModelData changed.
+        """
         # Reload config to ensure we have the latest paths from disk
         self.config_manager.config = self.config_manager.load_config()
 
         client_path = self.config_manager.config.get("client_data_path", "")
-        if not client_path or not os.path.isdir(client_path):
-            print(f"DEBUG: Client data path not set or invalid ({client_path}). Skipping DBC load.")
+        if client_path and not os.path.isdir(client_path):
+            print(f"DEBUG: Client data path invalid ({client_path}). Ignoring it.")
+            client_path = ""
+
+        # DBFilesClient\*.dbc straight from the mounted client archives (patch precedence applies)
+        mpq = MpqManager()
+        wow_client_path = self.config_manager.config.get("wow_client_path", "")
+        # ensure_initialized() waits out an initialize() running on another thread, so client_path and
+        # archives are consistent afterwards; a path changed in the settings is then mounted here.
+        if wow_client_path and mpq.ensure_initialized() and mpq.client_path != wow_client_path:
+            mpq.initialize_from_config()
+        if not wow_client_path or not mpq.archives:
+            mpq = None
+
+        if not client_path and mpq is None:
+            print("DEBUG: Neither client data path nor WoW client path is set. Skipping DBC load.")
             return
+        self.mpq = mpq
+        self.client_path = client_path
 
-        print(f"DEBUG: Attempting to load DBCs from: {client_path}")
-        
-        # Faction.dbc
-        faction_path = os.path.join(client_path, "Faction.dbc")
-        if os.path.exists(faction_path):
-            try:
-                self.factions = self.parser.read_faction_dbc(faction_path)
-                print(f"SUCCESS: Loaded {len(self.factions)} Factions.")
-            except Exception as e:
-                print(f"ERROR: Failed to parse Faction.dbc: {e}")
+        print(f"DEBUG: Attempting to load DBCs from: {client_path or 'client archives'}")
+
+        # Stage 1: unchanged tables are kept, the others come from the cache where possible
+        # and are parsed in parallel otherwise.
+        # Stage 2 joins CreatureDisplayInfo (parsed alongside stage 1) with CreatureModelData
+        # as soon as both are in.
+        jobs = {} # DBC name -> (reader, path or contents, cache sources)
+        for name, (attr, reader, _, _) in DBC_TABLES.items():
+            found = self._lookup(name, [name])
+            if found is None:
+                self._publish(futures, attr)
+                continue
+            sources, columns, dbc = found
+            if columns is not None:
+                self._assign_table(name, columns, futures)
+                self.sources[name] = sources
+            elif dbc is None:
+                self._publish(futures, attr)
+            else:
+                jobs[name] = (reader, dbc, sources)
+
+        found = self._lookup("DisplayInfoStore", ["CreatureDisplayInfo", "CreatureModelData"])
+        if found is None or found[1] is None and found[2] is None:
+            self._publish(futures, "display_infos")
+        elif found[1] is not None:
+            self._assign_display_infos(found[1], futures)
+            self.sources["DisplayInfoStore"] = found[0]
         else:
-            print(f"DEBUG: Faction.dbc not found at {faction_path}")
+            jobs["CreatureDisplayInfo"] = ("read_display_info_dbc", found[2], found[0])
 
-        # CreatureModelData.dbc (Dependencies first)
-        cmd_path = os.path.join(client_path, "CreatureModelData.dbc")
-        if os.path.exists(cmd_path):
-            try:
-                self.model_data = self.parser.read_creature_model_data_dbc(cmd_path)
-                print(f"SUCCESS: Loaded {len(self.model_data)} Model Data entries.")
-            except Exception as e:
-                print(f"ERROR: Failed to parse CreatureModelData.dbc: {e}")
+        found = self._lookup("Spell", ["Spell"])
+        if found is None or found[1] is None and found[2] is None:
+            self._publish(futures, "spells")
+        elif found[1] is not None:
+            self._assign_spells(found[1], futures)
+            self.sources["Spell"] = found[0]
         else:
-             print(f"DEBUG: CreatureModelData.dbc not found at {cmd_path}")
+            jobs["Spell"] = ("read_spell_dbc", found[2], found[0])
 
-        # CreatureDisplayInfo.dbc
-        cdi_path = os.path.join(client_path, "CreatureDisplayInfo.dbc")
-        if os.path.exists(cdi_path):
-            try:
-                raw_display_infos = self.parser.read_display_info_dbc(cdi_path)
-                # Merge Logic: DisplayID -> {ModelPath, TexturePath}
-                count = 0
-                for did, info in raw_display_infos.items():
-                    mid = info.get('model_id', 0)
-                    skin = info.get('skin1', '')
-                    
-                    # Lookup model path
-                    model_path = self.model_data.get(mid, "")
-                    
-                    if model_path:
-                        # Fix extension: .mdx -> .m2
-                        if model_path.lower().endswith('.mdx'):
-                            model_path = model_path[:-4] + '.m2'
-                        elif model_path.lower().endswith('.mdl'):
-                            model_path = model_path[:-4] + '.m2'
-                            
-                        self.display_infos[did] = {
-                            'model': model_path,
-                            'texture': skin
-                        }
-                        count += 1
-                        
-                print(f"SUCCESS: Loaded and Merged {count} Display Info entries.")
-            except Exception as e:
-                print(f"ERROR: Failed to parse CreatureDisplayInfo.dbc: {e}")
+        raw_display_infos = None
+        model_data_pending = "CreatureModelData" in jobs
+        for name, result in self._run_parse_jobs({name: job[:2] for name, job in jobs.items()}):
+            if isinstance(result, Exception):
+                print(f"ERROR: Failed to parse {name}.dbc: {result}")
+            elif name == "CreatureDisplayInfo":
+                raw_display_infos = result
+            elif name == "Spell":
+                self._store(name, jobs[name][2], result)
+                self._assign_spells(result, futures)
+            else:
+                columns = self._id_columns(result, DBC_TABLES[name][2])
+                self._store(name, jobs[name][2], columns)
+                self._assign_table(name, columns, futures)
+
+            if name == "CreatureModelData":
+                model_data_pending = False
+            if raw_display_infos is not None and not model_data_pending:
+                if self.model_data:
+                    columns = self._merge_display_infos(raw_display_infos)
+                    self._store("DisplayInfoStore", jobs["CreatureDisplayInfo"][2], columns)
+                    self._assign_display_infos(columns, futures)
+                raw_display_infos = None
+
+    def _assign_table(self, name: str, columns: dict, futures: Optional[Dict[str, Future]]):
+        attr, _, value_name, label = DBC_TABLES[name]
+        setattr(self, attr, dict(zip(columns['id'].tolist(), columns[value_name])))
+        print(f"SUCCESS: Loaded {len(getattr(self, attr))} {label}.")
+        if attr in SEARCH_TABLES:
+            self._update_search(attr)
+        self._publish(futures, attr)
+
+    def _assign_display_infos(self, columns: dict, futures: Optional[Dict[str, Future]]):
+        self.display_infos = DisplayInfoStore.from_columns(columns)
+        print(f"SUCCESS: Loaded and Merged {len(self.display_infos)} Display Info entries.")
+        self.model_index = ModelSearchIndex(self.display_infos)
+        self._update_search("display_infos")
+        self._publish(futures, "display_infos")
+
+    def _assign_spells(self, columns: dict, futures: Optional[Dict[str, Future]]):
+        self.spells = ColumnStore(columns)
+        print(f"SUCCESS: Loaded {len(self.spells)} Spells.")
+        self.spell_index = self._spell_index(self.spells)
+        self._update_search("spells")
+        self._publish(futures, "spells")
+
+    @staticmethod
+    def _spell_index(spells: ColumnStore) -> NameSearchIndex:
+        index, names = spells.strings.get("Name", (np.zeros(0, dtype=np.uint32), []))
+        return NameSearchIndex(spells.ids, index, names, spells)
+
+    def _update_search(self, name: str):
+        """Points the search service at the current contents of table name."""
+        if name == "display_infos":
+            index = self.model_index
+            label = index.display_infos.model
+        elif name == "spells":
+            index = self.spell_index
+            label = lambda sid, spells=index.records: self._spell_label(spells, sid)
         else:
-            print(f"DEBUG: CreatureDisplayInfo.dbc not found at {cdi_path}")
+            table = getattr(self, name)
+            index = NameSearchIndex.from_mapping(table)
+            label = table.get
+        self.search_service.add(name, index, label)
+
+    @staticmethod
+    def _spell_label(spells: ColumnStore, spell_id: int) -> str:
+        record = spells.get(spell_id, ["Name", "NameSubtext"])
+        return f"{record['Name']} ({record['NameSubtext']})" if record["NameSubtext"] else record["Name"]
 
-        # Map.dbc
-        map_path = os.path.join(client_path, "Map.dbc")
-        if os.path.exists(map_path):
+    def _locate_dbc(self, dbc_name: str):
+        """
+        Finds a DBC: a loose file in client_data_path wins (extracted or server-side DBCs),
+        otherwise DBFilesClient\\<dbc_name> from the client archives.
+        Returns (source, cache sources) or None. source is the file path, or a callable that reads
+        the archived file into memory; cache sources fingerprint whatever decides its contents.
+        """
+        if self.client_path:
+            path = os.path.join(self.client_path, dbc_name)
+            if os.path.exists(path):
+                return path, [file_source(path)]
+        if self.mpq is not None:
+            internal_path = "DBFilesClient\\" + dbc_name
+            chain = self.mpq.source_fingerprints(internal_path)
+            if chain:
+                return (lambda: self.mpq.read_file(internal_path, cache=False)), chain
+        return None
+
+    def _lookup(self, name: str, dbc_names: List[str]):
+        """
+        Looks up derived table name in the DBC cache.
+        dbc_names[0] is the DBC the table is read from; the rest are dependencies (names without .dbc).
+        Returns (cache sources, None, None) if the loaded table was built from the same sources,
+        (cache sources, cached columns, None) on a hit, (cache sources, None, source of the first DBC)
+        on a miss, or None if a DBC is missing. The source is a path or, for archived DBCs,
+        a callable that reads the file (see _locate_dbc).
+        """
+        located = []
+        for dbc_name in dbc_names:
+            found = self._locate_dbc(f"{dbc_name}.dbc")
+            if found is None:
+                print(f"DEBUG: {dbc_name}.dbc not found in {self.client_path or 'client data path'} or client archives")
+                return None
+            located.append(found)
+
+        sources = [source for _, chain in located for source in chain]
+        if self.sources.get(name) == sources:
+            return sources, None, None
+        columns = self.cache.load(name, sources)
+        if columns is not None:
+            return sources, columns, None
+
+        return sources, None, located[0][0]
+
+    def _store(self, name: str, sources: list, columns: dict):
+        # Readers return nothing for unreadable files; don't pin that result in the cache
+        # (and read the files again on the next reload).
+        if columns and len(next(iter(columns.values()))):
+            self.cache.save(name, sources, columns)
+            self.sources[name] = sources
+        else:
+            self.sources.pop(name, None)
+
+    def _run_parse_jobs(self, jobs: Dict[str, tuple]) -> Iterator[Tuple[str, object]]:
+        """
+        Parses DBCs, yielding (name, reader result or Exception) as each finishes.
+        jobs: name -> (DBCParser reader, path or archived source). With several loose files and cores
+        they run on a process pool, largest DBC first, so the load takes about as long as the largest table.
+        Archived DBCs are read and parsed here while the pool works: the reader only touches the projected
+        columns of the in-memory file, which would otherwise be copied and pickled whole to a worker.
+        Small loads (below PARALLEL_PARSE_BYTES), single-core machines and pool failures run inline:
+        starting worker processes costs more than parsing a few MB.
+        """
+        files = {name: os.path.getsize(source) for name, (_, source) in jobs.items() if isinstance(source, str)}
+        pooled = sorted(files, key=files.get, reverse=True)
+        workers = min(len(pooled), os.cpu_count() or 1)
+        pool = None
+        if workers > 1 and sum(files.values()) >= self.PARALLEL_PARSE_BYTES:
+            try:
+                # spawn: forking a process that runs Qt and worker threads is not safe
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            except (OSError, ValueError) as e:
+                print(f"DEBUG: Parsing DBCs inline, no process pool: {e}")
+        if pool is None:
+            pooled = []
+        inline = [name for name in jobs if name not in pooled]
+
+        def parse_inline(name: str):
+            reader, source = jobs[name]
             try:
-                self.maps = self.parser.read_map_dbc(map_path)
-                print(f"SUCCESS: Loaded {len(self.maps)} Maps.")
+                if callable(source):
+                    source = source()
+                    if source is None:
+                        raise IOError(f"cannot read {name}.dbc from the client archives")
+                return _parse_dbc(reader, source)
             except Exception as e:
-                print(f"ERROR: Failed to parse Map.dbc: {e}")
-        else:
-            print(f"DEBUG: Map.dbc not found at {map_path}")
+                return e
+
+        if pool is None:
+            for name in inline:
+                yield name, parse_inline(name)
+            return
+
+        with pool:
+            submitted = {pool.submit(_parse_dbc, *jobs[name]): name for name in pooled}
+            for name in inline:
+                yield name, parse_inline(name)
+            for future in as_completed(submitted):
+                name = submitted[future]
+                try:
+                    yield name, future.result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. could not start): parse this one here instead
+                    yield name, parse_inline(name)
+                except Exception as e:
+                    yield name, e
+
+    @staticmethod
+    def _id_columns(table: dict, value_name: str) -> dict:
+        """{id: str} -> cache columns {'id': uint32 array, value_name: [str]}."""
+        return {'id': np.fromiter(table.keys(), dtype=np.uint32, count=len(table)),
+                value_name: list(table.values())}
+
+    def _merge_display_infos(self, raw_display_infos: dict) -> dict:
+        """
+        Merge Logic: DisplayID -> {ModelPath, TexturePath}, as DisplayInfoStore cache columns.
+        Display infos whose model is unknown are dropped.
+        """
+        rows = []
+        for did, info in raw_display_infos.items():
+            mid = info.get('model_id', 0)
+            skin = info.get('skin1', '')
+
+            # Lookup model path
+            model_path = self.model_data.get(mid, "")
+
+            if model_path:
+                # Fix extension: .mdx -> .m2
+                if model_path.lower().endswith('.mdx'):
+                    model_path = model_path[:-4] + '.m2'
+                elif model_path.lower().endswith('.mdl'):
+                    model_path = model_path[:-4] + '.m2'
+
+                rows.append((did, model_path, skin))
+        return DisplayInfoStore.from_rows(rows).columns()
 
     def get_map_name(self, map_id):
         return self.maps.get(map_id, f"Unknown Map ({map_id})")
 
     def search_models(self, query: str, limit=100) -> list:
         """
-        Search models by path or ID.
-        Returns list of (DisplayID, ModelPath, TexturePath).
+        Search models by display ID, model path (or its directory/file name tokens) or texture name.
+        Returns list of (DisplayID, ModelPath, TexturePath), best matches first.
         """
-        query = query.lower()
+        index = self.model_index
+        store = index.display_infos
+        return [(did, store.model(did), store.texture(did)) for did in index.search(query, limit)]
+
+    def get_spell(self, spell_id, fields: Optional[List[str]] = None) -> Optional[dict]:
+        """Spell spell_id as {field: value} (SPELL_FIELDS, or just fields), or None if unknown."""
+        return self.spells.get(spell_id, fields)
+
+    def get_spell_name(self, spell_id) -> str:
+        name = self.spells.value(spell_id, "Name")
+        return name if name is not None else f"Unknown Spell ({spell_id})"
+
+    def search_spells(self, query: str, limit=100) -> list:
+        """
+        Search spells by ID or name (whole words, word prefixes, then substrings).
+        Returns list of (SpellID, Name, Rank), best matches first.
+        """
+        index = self.spell_index
+        spells = index.records
         results = []
-        for did, info in self.display_infos.items():
-            path = info['model']
-            tex = info['texture']
-            
-            if query in path.lower() or query == str(did):
-                results.append((did, path, tex))
-                if len(results) >= limit:
-                    break
+        for sid in index.search(query, limit):
+            record = spells.get(sid, ["Name", "NameSubtext"])
+            results.append((sid, record["Name"], record["NameSubtext"]))
         return results
+
+    def search(self, query: str, tables: Optional[List[str]] = None, limit=20) -> List[SearchHit]:
+        """
+        Searches factions, maps, display models and spells (or just tables, see SEARCH_TABLES)
+        by ID, name or model path, tolerating typos. Tables still loading are searched as they are.
+        Returns up to limit SearchHit(table, id, label, score), best matches first.
+        """
+        return self.search_service.search(query, tables, limit)
@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import re
+import json
+import time
+import fnmatch
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Tuple
+from src.core.mpq_manager import MpqManager
+from src.utils.mpq_reader import MpqReader, MpqBlock
+
+# Per-process reader cache for worker processes (mmaps can't be pickled, so each worker opens its own)
+_worker_readers: Dict[str, MpqReader] = {}
+
+
+def _extract_job(job: Tuple[str, int, int, tuple, str]) -> Tuple[str, int, Optional[str]]:
+    """
+    Worker: reads one block and writes it to dest.
+    Returns (dest, bytes written, error message or None).
+    """
+    archive_path, header_offset, sector_size, block, dest = job
+    try:
+        reader = _worker_readers.get(archive_path)
+        if reader is None:
+            reader = MpqReader(archive_path, header_offset, sector_size)
+            _worker_readers[archive_path] = reader
+
+        data = reader.read_block(MpqBlock(*block))
+        if data is None:
+            return dest, 0, "unreadable (encrypted, imploded or empty)"
+
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, 'wb') as f:
+            f.write(data)
+        return dest, len(data), None
+    except Exception as e:
+        return dest, 0, str(e)
+
+
+def _safe_dest(output_dir: str, name: str) -> Optional[str]:
+    """
+    Output path of internal file name under output_dir, or None if the name would leave it
+    (names come from the archives or imported listfiles: '..', absolute or drive parts, empty parts).
+    """
+    parts = name.replace('/', '\\').split('\\')
+    for part in parts:
+        if part in ('', '.', '..') or ':' in part or os.path.isabs(part):
+            return None
+    dest = os.path.realpath(os.path.join(output_dir, *parts))
+    root = os.path.realpath(output_dir)
+    if os.path.commonpath([root, dest]) != root or dest == root:
+        return None
+    return dest
+
+
+class MpqExtractor:
+    """
+    Bulk extraction of MPQ files to a loose-file directory.
+    Patterns are globs over internal paths (case-insensitive, '/' or '\\', e.g. 'Creature\\*.m2').
+    Each match is taken from its patch-priority winner, and files are written by a process pool.
+    A manifest in the output directory records the owning archive fingerprint of every file,
+    so re-running only extracts files whose winning archive changed.
+    """
+    MANIFEST_FILE = ".extract_manifest.json"
+
+    def __init__(self, mpq_manager: Optional[MpqManager] = None):
+        self.mpq = mpq_manager or MpqManager()
+
+    def match(self, patterns: List[str]) -> List[str]:
+        """Returns the normalized index keys matching any of the glob patterns."""
+        regex = re.compile('|'.join(fnmatch.translate(self.mpq.normalize_path(p)) for p in patterns))
+        return [key for key in self.mpq.file_index if regex.match(key)]
+
+    def extract(self, patterns: List[str], output_dir: str, workers: Optional[int] = None) -> Dict:
+        """
+        Extracts every file matching patterns into output_dir (internal directories become folders).
+        Returns stats: matched, extracted, skipped, failed, bytes, seconds, mb_per_sec.
+        """
+        start_time = time.perf_counter()
+        manifest = self._load_manifest(output_dir)
+        fingerprints = {a.path: list(MpqManager.archive_fingerprint(a.path)) for a in self.mpq.archives}
+
+        keys = self.match(patterns)
+        jobs = []
+        job_keys = {}
+        skipped = 0
+        failed = 0
+        for key in keys:
+            entry = self.mpq.resolve(self.mpq.file_index[key].name)
+            if entry is None:
+                continue
+            dest = _safe_dest(output_dir, entry.name)
+            if dest is None:
+                failed += 1
+                print(f"Failed to extract {entry.name}: path leaves the output directory")
+                continue
+            current = [entry.archive.path] + fingerprints[entry.archive.path]
+            if manifest.get(key) == current and os.path.exists(dest) and os.path.getsize(dest) == entry.block.size:
+                skipped += 1
+                continue
+            jobs.append((entry.archive.path, entry.archive.offset, entry.archive.sector_size,
+                         tuple(entry.block), dest))
+            job_keys[dest] = (key, current)
+
+        # Sequential on-disk order within each archive
+        jobs.sort(key=lambda job: (job[0], job[3][0]))
+
+        extracted = 0
+        total_bytes = 0
+        if jobs:
+            # spawn: forked workers would inherit mpq_reader's sector thread pool without its threads
+            # and block forever on the first large file
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                for dest, written, error in pool.map(_extract_job, jobs, chunksize=32):
+                    key, current = job_keys[dest]
+                    if error:
+                        failed += 1
+                        manifest.pop(key, None)
+                        print(f"Failed to extract {key}: {error}")
+                        continue
+                    extracted += 1
+                    total_bytes += written
+                    manifest[key] = current
+            self._save_manifest(output_dir, manifest)
+
+        seconds = time.perf_counter() - start_time
+        stats = {
+            "matched": len(keys),
+            "extracted": extracted,
+            "skipped": skipped,
+            "failed": failed,
+            "bytes": total_bytes,
+            "seconds": round(seconds, 3),
+            "mb_per_sec": round(total_bytes / (1024 * 1024) / seconds, 2) if seconds > 0 else 0.0,
+        }
+        print(f"Extracted {extracted} files ({stats['mb_per_sec']} MB/s), "
+              f"skipped {skipped} up-to-date, {failed} failed.")
+        return stats
+
+    def _load_manifest(self, output_dir: str) -> Dict:
+        path = os.path.join(output_dir, self.MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def _save_manifest(self, output_dir: str, manifest: Dict):
+        path = os.path.join(output_dir, self.MANIFEST_FILE)
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(path + ".tmp", 'w') as f:
+                json.dump(manifest, f)
+            os.replace(path + ".tmp", path)
+        except IOError as e:
+            print(f"Error saving extraction manifest: {e}")
+
+
+if __name__ == "__main__":
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Extract files from the WoW client MPQs.")
+    arg_parser.add_argument("output_dir")
+    arg_parser.add_argument("patterns", nargs="+", help="e.g. 'Creature\\*.m2' 'Creature\\*.blp'")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    if MpqManager().initialize_from_config():
+        MpqExtractor().extract(args.patterns, args.output_dir, args.workers)
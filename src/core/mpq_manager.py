@@ -1,15 +1,307 @@
 import os
-import mpyq
-from typing import Optional, List
+import re
+import mmap
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional, Iterator, List, Dict, Tuple
+from src.utils.mpq_crypto import hash_name_pair, hash_name_pairs
+from src.utils.search_index import PathSearchIndex
+from src.utils.string_table import FrontCodedTable
+from src.utils.mpq_reader import (MpqReader, MpqFileStream, MpqBlock, BytesLike, decompress,
+                                  pack_tables, unpack_tables, TABLE_HASH_ROW, TABLE_BLOCK_ROW,
+                                  MPQ_FILE_IMPLODE, MPQ_FILE_COMPRESS, MPQ_FILE_ENCRYPTED,
+                                  MPQ_FILE_SINGLE_UNIT, MPQ_FILE_EXISTS)
+try:
+    import mpyq
+except ImportError:
+    mpyq = None
+import numpy as np
+
+# Client load order (lowest priority first); the patch chain is discovered by _PATCH_RE.
+BASE_ARCHIVES = ["common.MPQ", "common-2.MPQ", "expansion.MPQ", "lichking.MPQ"]
+LOCALE_ARCHIVES = [
+    "locale-{locale}.mpq",
+    "speech-{locale}.mpq",
+    "expansion-locale-{locale}.mpq",
+    "lichking-locale-{locale}.mpq",
+    "expansion-speech-{locale}.mpq",
+    "lichking-speech-{locale}.mpq",
+]
+PREFERRED_LOCALES = ["enUS", "enGB", "deDE", "frFR", "esES", "ruRU"]
+_PATCH_RE = re.compile(r'^patch(?:-([0-9a-z]))?\.mpq$')
+_LOCALE_DIR_RE = re.compile(r'^[a-z]{2}[A-Z]{2}$')
+
+
+def _patch_rank(suffix: Optional[str]) -> Tuple[int, str]:
+    """Sort key for a patch suffix: patch.MPQ first, then patch-2..9, then patch-A..Z."""
+    return (0, '') if suffix is None else (1, suffix.upper())
+
+
+# Index cache format. Bump INDEX_CACHE_VERSION whenever the layout changes.
+INDEX_CACHE_VERSION = 4
+_CACHE_MAGIC = b'AFMI'
+_CACHE_HEADER = struct.Struct('<4sIIIIII')   # magic, version, archive count, entry count, names size,
+                                             # override count, imported listfile count
+_CACHE_ARCHIVE = struct.Struct('<HQQQIII')   # path length, size, mtime_ns, header offset, sector size,
+                                             # hash table rows, block table rows
+_CACHE_LISTFILE = struct.Struct('<HQQ')      # path length, size, mtime_ns
+_CACHE_ENTRY = struct.Struct('<HxxIIII')     # archive index, offset, archived size, size, flags
+_CACHE_OVERRIDE = struct.Struct('<IH')       # entry row, shadowed archive index
+
+
+def _find_blocks_bulk(archive, hash_a, hash_b) -> List[Tuple[int, MpqBlock]]:
+    """
+    Looks up many (hash_a, hash_b) pairs in one archive.
+    Returns (position, block) for every pair the archive contains, in position order.
+    The archive hash table is sorted once and probed with searchsorted.
+    """
+    hash_lookup, block_table = archive.tables()
+    hits = []
+    if not len(hash_a) or not hash_lookup:
+        return hits
+    table_keys = np.fromiter(((a << 32) | b for a, b in hash_lookup), dtype=np.uint64, count=len(hash_lookup))
+    table_blocks = np.fromiter(hash_lookup.values(), dtype=np.int64, count=len(hash_lookup))
+    order = np.argsort(table_keys)
+    table_keys = table_keys[order]
+    table_blocks = table_blocks[order]
+
+    keys = (np.asarray(hash_a, dtype=np.uint64) << np.uint64(32)) | np.asarray(hash_b, dtype=np.uint64)
+    slots = np.minimum(np.searchsorted(table_keys, keys), len(table_keys) - 1)
+    positions = np.flatnonzero(table_keys[slots] == keys)
+    for pos, index in zip(positions.tolist(), table_blocks[slots[positions]].tolist()):
+        block = block_table[index]
+        if block.flags & MPQ_FILE_EXISTS:
+            hits.append((pos, block))
+    return hits
+
+
+class MpqArchiveHandle:
+    """
+    mpyq backend: wraps an opened mpyq archive.
+    Builds a (hash_a, hash_b) -> block dict once so lookups skip mpyq's linear hash table scan.
+    When the header location is already known (index cache hit) the file is only opened;
+    the cached tables are restored (or mpyq parses them, skipping the listfile)
+    the first time a hash lookup is needed.
+    """
+
+    def __init__(self, path: str, header_offset: Optional[int] = None, sector_size: Optional[int] = None,
+                 tables: Optional[Tuple[bytes, bytes]] = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.archive = None
+        self.hash_lookup: Optional[Dict[Tuple[int, int], int]] = None
+        self.block_table: list = []
+        self.files: List[str] = []
+        # One file handle is shared by all readers, so seek + read must be atomic.
+        self._io_lock = threading.Lock()
+        self._tables_lock = threading.Lock()
+        self._packed_tables = tables
+
+        if header_offset is None:
+            self._load_tables(listfile=True)
+        else:
+            self.offset = header_offset
+            self.sector_size = sector_size
+            self.file = open(path, 'rb')
+
+    def _load_tables(self, listfile: bool = False):
+        self.archive = mpyq.MPQArchive(self.path, listfile=listfile)
+        if not hasattr(self, 'file'):
+            self.file = self.archive.file
+        self.offset = self.archive.header['offset']
+        self.sector_size = 512 << self.archive.header['sector_size_shift']
+
+        self.block_table = self.archive.block_table
+        block_count = len(self.block_table)
+        hash_lookup = {}
+        for entry in self.archive.hash_table:
+            if entry.block_table_index < block_count:
+                hash_lookup.setdefault((entry.hash_a, entry.hash_b), entry.block_table_index)
+        self.hash_lookup = hash_lookup
+        if not listfile:
+            return
+
+        # mpyq archive.files is a list of bytes
+        self.files = []
+        for filename_bytes in self.archive.files or []:
+            try:
+                self.files.append(filename_bytes.decode('utf-8'))
+            except UnicodeDecodeError:
+                continue
+
+    def tables(self) -> Tuple[Dict[Tuple[int, int], int], list]:
+        """Returns (hash_lookup, block_table), parsing the archive tables on first use."""
+        if self.hash_lookup is None:
+            with self._tables_lock:
+                if self.hash_lookup is None:
+                    if self._packed_tables is not None:
+                        # Index cache hit: the decrypted tables were saved with the index.
+                        hash_lookup, self.block_table = unpack_tables(*self._packed_tables)
+                        self._packed_tables = None
+                        self.hash_lookup = hash_lookup
+                    else:
+                        self._load_tables()
+        return self.hash_lookup, self.block_table
+
+    def find_block(self, filename: str):
+        """Returns the block table entry for filename, or None if the archive does not contain it."""
+        hash_lookup, block_table = self.tables()
+        index = hash_lookup.get(hash_name_pair(filename))
+        if index is None:
+            return None
+        block = block_table[index]
+        if not block.flags & MPQ_FILE_EXISTS:
+            return None
+        return block
+
+    def read_block(self, block) -> Optional[bytes]:
+        """
+        Reads and decompresses a block table entry.
+        Mirrors mpyq.MPQArchive.read_file without the per-call hash table scan.
+        """
+        if block.archived_size == 0:
+            return None
+        if block.flags & MPQ_FILE_ENCRYPTED:
+            print(f"Encrypted files are not supported ({self.name}).")
+            return None
+
+        with self._io_lock:
+            self.file.seek(block.offset + self.offset)
+            file_data = self.file.read(block.archived_size)
+
+        if block.flags & MPQ_FILE_SINGLE_UNIT:
+            # Compression only happens when at least one byte is gained.
+            if block.flags & MPQ_FILE_COMPRESS and block.size > block.archived_size:
+                file_data = decompress(file_data)
+            return file_data
+
+        # File consists of many sectors that are compressed separately.
+        # (mpyq counts size // sector_size + 1 sectors, one too many for exact multiples.)
+        sectors = (block.size + self.sector_size - 1) // self.sector_size
+        positions = struct.unpack(f'<{sectors + 1}I', file_data[:4 * (sectors + 1)])
+
+        result = BytesIO()
+        sector_bytes_left = block.size
+        for i in range(sectors):
+            sector = file_data[positions[i]:positions[i + 1]]
+            expected = min(self.sector_size, sector_bytes_left)
+            # Sectors that did not shrink are stored as-is, at any position in the file.
+            if block.flags & MPQ_FILE_COMPRESS and len(sector) < expected:
+                sector = decompress(sector)
+            sector_bytes_left -= expected
+            result.write(sector)
+        return result.getvalue()
+
+    def read_raw(self, block, start: int, size: int) -> bytes:
+        """Returns size bytes of the block's archived (still compressed) data from start."""
+        with self._io_lock:
+            self.file.seek(self.offset + block.offset + start)
+            return self.file.read(size)
+
+
+class MpqFileEntry:
+    """
+    One file in the merged index: the archive that wins for it and the name it is listed under.
+    The block entry is resolved on first read.
+    """
+    __slots__ = ('archive', 'name', 'block')
+
+    def __init__(self, archive, name: str, block=None):
+        self.archive = archive
+        self.name = name
+        self.block = block
+
+
+class LruByteCache:
+    """
+    LRU cache of decompressed files, capped by total bytes rather than entry count.
+    Files larger than the whole budget are never cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, BytesLike]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[BytesLike]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: BytesLike):
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._entries[key] = data
+            self.current_bytes += size
+            self._evict()
+
+    def set_budget(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max(0, max_bytes)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, data = self._entries.popitem(last=False)
+            self.current_bytes -= len(data)
+            self.evictions += 1
+
 
 class MpqManager:
+    INDEX_CACHE_FILE = os.path.join("data", "mpq_index.cache")
+    DEFAULT_CACHE_BUDGET = 64 * 1024 * 1024
+
     _instance = None
-    
+
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super(MpqManager, cls).__new__(cls)
             cls._instance.archives = []
             cls._instance.client_path = None
+            cls._instance.file_index = {}
+            cls._instance.overrides = {}
+            cls._instance.imported_listfiles = {}
+            cls._instance.locale = None
+            cls._instance._missing = set()
+            cls._instance.file_cache = LruByteCache(cls.DEFAULT_CACHE_BUDGET)
+            cls._instance.backend = "native"
+            cls._instance._search_index = None
+            cls._instance._name_table = None
+            cls._instance._init_lock = threading.RLock()
+            cls._instance._executor = None
         return cls._instance
 
     @classmethod
@@ -18,150 +310,671 @@ class MpqManager:
              cls._instance = MpqManager()
         return cls._instance
 
+    def initialize_from_config(self) -> bool:
+        """
+        Initializes from config.json (wow_client_path, mpq_cache_mb, mpq_backend,
+        mpq_parallel_threshold_kb, mpq_listfile).
+        Returns False if the client path is not configured.
+        """
+        from src.core.config_manager import ConfigManager
+        with self._init_lock:
+            config = ConfigManager().config
+            self.set_backend(config.get("mpq_backend", "native"))
+            self.set_parallel_threshold(int(config.get("mpq_parallel_threshold_kb", 256)) * 1024)
+            self.set_cache_budget(int(config.get("mpq_cache_mb", self.DEFAULT_CACHE_BUDGET // (1024 * 1024))) * 1024 * 1024)
+
+            client_path = config.get("wow_client_path")
+            if not client_path:
+                print("WoW Client Path not configured.")
+                return False
+            self.initialize(client_path)
+
+            listfile = config.get("mpq_listfile")
+            if listfile and self.archives:
+                self.import_listfile(listfile)
+            return True
+
+    @staticmethod
+    def normalize_path(internal_path: str) -> str:
+        """
+        Normalizes an internal path to the index key format.
+        The MPQ name hash ignores case and treats '/' as '\\', so the index does the same.
+        """
+        return internal_path.replace('/', '\\').lower()
+
     def initialize(self, client_path: str):
         """
         Initializes the MPQ Manager with the WoW client path.
-        Loads archives in priority order:
-        patch-3.MPQ -> patch-2.MPQ -> patch.MPQ -> lichking.MPQ -> expansion.MPQ -> common.MPQ
+        Discovers archives by client load order (see _discover_archives), e.g.
+        patch-A.MPQ -> patch-enUS-3.MPQ -> patch-3.MPQ -> ... -> patch.MPQ -> locale-enUS.MPQ -> ... -> common.MPQ
+        Then restores the merged file index from the on-disk cache, or builds (and caches) it.
         """
+        with self._init_lock:
+            self._initialize(client_path)
+
+    def _initialize(self, client_path: str):
         if self.client_path == client_path:
             return # Already initialized
-            
+
         self.client_path = client_path
         self.archives = []
-        
+        self.file_index = {}
+        self.overrides = {}
+        self.imported_listfiles = {}
+        self._missing = set()
+        self._search_index = None
+        self._name_table = None
+        self.file_cache.clear()
+
         data_path = os.path.join(client_path, "Data")
         if not os.path.exists(data_path):
             print(f"Error: Data folder not found at {data_path}")
             return
 
-        # Priority List (Highest to Lowest)
-        # Note: Actual priority in client is determined by alphanumeric sorting of patch-*.MPQ usually, 
-        # but hardcoding known WotLK structure is fine for this task.
-        priorities = [
-            "patch-3.MPQ",
-            "patch-2.MPQ",
-            "patch.MPQ",
-            "lichking.MPQ",
-            "expansion.MPQ",
-            "common.MPQ"
-        ]
-        
-        # Scan for Locales (enUS, enGB, etc)
-        # They should be higher priority than Base but lower than patches? 
-        # Usually: patch-enUS-3.MPQ > locale-enUS.MPQ > ...
-        # Let's check subfolders.
-        locale_archives = []
-        possible_locales = ["enUS", "enGB", "deDE", "frFR", "esES", "ruRU"]
-        
-        for loc in possible_locales:
-            loc_path = os.path.join(data_path, loc)
-            if os.path.isdir(loc_path):
-                print(f"DEBUG: Found Locale Directory: {loc}")
-                # Load locale specific MPQs
-                # patch-enUS-3.MPQ
-                # patch-enUS-2.MPQ
-                # locale-enUS.MPQ
-                
-                # We prepend to priorities? Or load immediately?
-                # Let's load them into a list and prepend to self.archives later?
-                # Actually, simpler to just add them to the 'priorities' list if we have full paths?
-                # But priorities list assumes root Data folder.
-                
-                # Better: Load them here and add to self.archives
-                loc_files = [
-                    f"patch-{loc}-3.MPQ",
-                    f"patch-{loc}-2.MPQ",
-                    f"locale-{loc}.MPQ"
-                ]
-                
-                for lf in loc_files:
-                    full_loc_mpq = os.path.join(loc_path, lf)
-                    if os.path.exists(full_loc_mpq):
-                        try:
-                            archive = mpyq.MPQArchive(full_loc_mpq)
-                            self.archives.append(archive) # Append? Or Prepend?
-                            # If we append, they are lower priority than what we already loaded?
-                            # Wait, we haven't loaded priorities yet.
-                            print(f"DEBUG: Loading Locale Archive: {lf}")
-                            locale_archives.append(archive)
-                        except Exception as e:
-                            print(f"Failed to load {lf}: {e}")
-
-        # Add Locale archives to main list (High Priority for now)
-        self.archives.extend(locale_archives)
-        
-        # Load archives
-        for filename in priorities:
-            chk_path = os.path.join(data_path, filename)
-            if os.path.exists(chk_path):
-                try:
-                    archive = mpyq.MPQArchive(chk_path)
-                    self.archives.append(archive)
-                    print(f"Loaded MPQ: {filename}")
-                except Exception as e:
-                    print(f"Failed to load {filename}: {e}")
-            else:
-                # Also check common/ patches which might be loose? 
-                # WotLK structure is usually Data/common.MPQ etc.
-                pass
-
-    def read_file(self, internal_path: str) -> Optional[bytes]:
+        archive_paths = self._discover_archives(data_path)
+        if self._load_index_cache(archive_paths):
+            return
+
+        for path in archive_paths:
+            try:
+                self.archives.append(self._open_archive(path))
+                print(f"Loaded MPQ: {os.path.basename(path)}")
+            except Exception as e:
+                print(f"Failed to load {os.path.basename(path)}: {e}")
+
+        self._build_index()
+        self._save_index_cache()
+
+    def set_backend(self, backend: str):
+        """
+        Selects the archive backend used for archives mounted from now on:
+        "native" (memory-mapped MpqReader, zero-copy for stored files) or "mpyq".
+        """
+        if backend not in ("native", "mpyq"):
+            raise ValueError(f"Unknown MPQ backend: {backend}")
+        if backend == "mpyq" and mpyq is None:
+            print("mpyq not installed. Using native MPQ backend.")
+            backend = "native"
+        self.backend = backend
+
+    def _open_archive(self, path: str, header_offset: Optional[int] = None, sector_size: Optional[int] = None,
+                      tables: Optional[Tuple[bytes, bytes]] = None):
+        if self.backend == "mpyq":
+            return MpqArchiveHandle(path, header_offset, sector_size, tables)
+        return MpqReader(path, header_offset, sector_size, tables)
+
+    def _discover_archives(self, data_path: str) -> List[str]:
+        """
+        Returns the archive paths to mount, highest priority first, following the client's load order:
+        base archives, then the locale archives, then the patch chain. Patches are ranked by suffix
+        (patch.MPQ, then patch-2..9, then patch-A..Z), and each locale patch sits just above the
+        Data patch with the same suffix, so custom server patches (patch-4.MPQ, patch-A.MPQ...) mount too.
+        """
+        self.locale = self._detect_locale(data_path)
+        data_files = self._list_mpqs(data_path)
+
+        load_order = [data_files[name.lower()] for name in BASE_ARCHIVES if name.lower() in data_files]
+
+        patches = []
+        for lower, path in data_files.items():
+            match = _PATCH_RE.match(lower)
+            if match:
+                patches.append((_patch_rank(match.group(1)), 0, path))
+
+        if self.locale:
+            print(f"DEBUG: Found Locale Directory: {self.locale}")
+            loc = self.locale.lower()
+            locale_files = self._list_mpqs(os.path.join(data_path, self.locale))
+            for pattern in LOCALE_ARCHIVES:
+                name = pattern.format(locale=loc)
+                if name in locale_files:
+                    load_order.append(locale_files[name])
+
+            locale_patch_re = re.compile(rf'^patch-{loc}(?:-([0-9a-z]))?\.mpq$')
+            for lower, path in locale_files.items():
+                match = locale_patch_re.match(lower)
+                if match:
+                    patches.append((_patch_rank(match.group(1)), 1, path))
+
+        load_order += [path for _, _, path in sorted(patches)]
+        load_order.reverse()
+        return load_order
+
+    @staticmethod
+    def _list_mpqs(directory: str) -> Dict[str, str]:
+        """Returns lowercased file name -> path for the .MPQ files in directory (names are case-insensitive)."""
+        try:
+            return {name.lower(): os.path.join(directory, name) for name in os.listdir(directory)
+                    if name.lower().endswith('.mpq') and os.path.isfile(os.path.join(directory, name))}
+        except OSError:
+            return {}
+
+    def _detect_locale(self, data_path: str) -> Optional[str]:
+        """
+        Picks the client locale: the first Data/<xxYY> folder holding a locale-xxYY.MPQ,
+        preferring PREFERRED_LOCALES. The client only mounts one locale.
+        """
+        try:
+            found = sorted(name for name in os.listdir(data_path)
+                           if _LOCALE_DIR_RE.match(name) and os.path.isdir(os.path.join(data_path, name)))
+        except OSError:
+            return None
+
+        found = [loc for loc in found
+                 if f"locale-{loc.lower()}.mpq" in self._list_mpqs(os.path.join(data_path, loc))]
+        for loc in PREFERRED_LOCALES:
+            if loc in found:
+                return loc
+        return found[0] if found else None
+
+    def _build_index(self):
+        """
+        Builds the winner map: normalized path -> MpqFileEntry of the highest priority archive
+        that actually contains the file (not just the highest one listing it).
+        Every listfile name is hashed once, in bulk, and looked up in all archives;
+        lower-priority hits are recorded in overrides for override_report().
+        """
+        names = {}
+        for archive in self.archives:
+            for filename in archive.files:
+                names.setdefault(self.normalize_path(filename), filename)
+        self.file_index = {}
+        self.overrides = {}
+        self._merge_names(list(names.values()), list(names))
+
+        # The listfiles are only needed to build the index; names live in the index from here on.
+        for archive in self.archives:
+            archive.files = []
+        print(f"Indexed {len(self.file_index)} files across {len(self.archives)} archives "
+              f"({len(self.overrides)} overridden by patches).")
+
+    def _merge_names(self, names: List[str], keys: List[str]) -> int:
+        """
+        Adds the winning entry of every name (keys are the normalized names) to the index.
+        Names no archive contains are dropped. Returns the number of names added.
+        """
+        hash_a, hash_b = hash_name_pairs(names)
+        winners: Dict[int, MpqFileEntry] = {}
+        for archive_idx, archive in enumerate(self.archives):
+            for pos, block in _find_blocks_bulk(archive, hash_a, hash_b):
+                if pos not in winners:
+                    winners[pos] = MpqFileEntry(archive, names[pos], block)
+                else:
+                    self.overrides.setdefault(keys[pos], []).append(archive_idx)
+
+        for pos, entry in winners.items():
+            self.file_index[keys[pos]] = entry
+            self._missing.discard(keys[pos])
+        if winners:
+            self._search_index = None
+            self._name_table = None
+        return len(winners)
+
+    def override_report(self, filter_str: str = "") -> Dict[str, Dict[str, List[str]]]:
+        """
+        Lists which patch overrides which file: winning archive name -> {file: [shadowed archive names]}.
+        Only files present in more than one archive appear. filter_str narrows by path substring.
+        """
+        filter_key = self.normalize_path(filter_str)
+        report: Dict[str, Dict[str, List[str]]] = {}
+        for key, shadowed in self.overrides.items():
+            if filter_key not in key:
+                continue
+            entry = self.file_index.get(key)
+            if entry is None:
+                continue
+            report.setdefault(entry.archive.name, {})[entry.name] = [self.archives[i].name for i in shadowed]
+        return report
+
+    def debug_overrides(self, filter_str: str = ""):
+        """Prints override_report() grouped by winning archive."""
+        report = self.override_report(filter_str)
+        if not report:
+            print("DEBUG: No overridden files.")
+            return
+        for archive in self.archives:
+            files = report.get(archive.name)
+            if not files:
+                continue
+            print(f"{archive.name} overrides {len(files)} files:")
+            for name in sorted(files):
+                print(f"  {name} (over {', '.join(files[name])})")
+
+    # --- Index Cache ---
+
+    @staticmethod
+    def archive_fingerprint(path: str) -> Tuple[int, int]:
+        """Returns (size, mtime_ns) for an archive; any change invalidates cached data derived from it."""
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+
+    def _load_index_cache(self, archive_paths: List[str]) -> bool:
+        """
+        Restores archives and the merged index from INDEX_CACHE_FILE.
+        Only succeeds if the cache was written for exactly these archives (path, size, mtime).
+        Archives are opened without parsing their tables; the saved hash and block tables
+        are unpacked on the first lookup that misses the index, so nothing is decrypted.
+        """
+        if not archive_paths or not os.path.exists(self.INDEX_CACHE_FILE):
+            return False
+
+        try:
+            fingerprints = [(p, *self.archive_fingerprint(p)) for p in archive_paths]
+            with open(self.INDEX_CACHE_FILE, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                (magic, version, archive_count, entry_count, names_size, override_count,
+                 listfile_count) = _CACHE_HEADER.unpack_from(mm, 0)
+                if magic != _CACHE_MAGIC or version != INDEX_CACHE_VERSION or archive_count != len(archive_paths):
+                    return False
+
+                pos = _CACHE_HEADER.size
+                cached_archives = []
+                for _ in range(archive_count):
+                    (path_len, size, mtime_ns, header_offset, sector_size, hash_rows,
+                     block_rows) = _CACHE_ARCHIVE.unpack_from(mm, pos)
+                    pos += _CACHE_ARCHIVE.size
+                    path = mm[pos:pos + path_len].decode('utf-8')
+                    pos += path_len
+                    cached_archives.append(((path, size, mtime_ns), header_offset, sector_size,
+                                            hash_rows, block_rows))
+
+                if [cached[0] for cached in cached_archives] != fingerprints:
+                    return False
+
+                imported_listfiles = {}
+                for _ in range(listfile_count):
+                    path_len, size, mtime_ns = _CACHE_LISTFILE.unpack_from(mm, pos)
+                    pos += _CACHE_LISTFILE.size
+                    imported_listfiles[mm[pos:pos + path_len].decode('utf-8')] = (size, mtime_ns)
+                    pos += path_len
+
+                names = mm[pos:pos + names_size].decode('utf-8').split('\n') if entry_count else []
+                pos += names_size
+                with memoryview(mm) as view:
+                    rows = list(_CACHE_ENTRY.iter_unpack(view[pos:pos + entry_count * _CACHE_ENTRY.size]))
+                    pos += entry_count * _CACHE_ENTRY.size
+                    override_rows = list(_CACHE_OVERRIDE.iter_unpack(
+                        view[pos:pos + override_count * _CACHE_OVERRIDE.size]))
+                    pos += override_count * _CACHE_OVERRIDE.size
+                    tables = []
+                    for _, _, _, hash_rows, block_rows in cached_archives:
+                        hash_size = hash_rows * TABLE_HASH_ROW.size
+                        block_size = block_rows * TABLE_BLOCK_ROW.size
+                        tables.append((view[pos:pos + hash_size].tobytes(),
+                                       view[pos + hash_size:pos + hash_size + block_size].tobytes()))
+                        pos += hash_size + block_size
+                    if pos > len(mm):
+                        raise ValueError("truncated archive tables")
+        except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+            print(f"Ignoring MPQ index cache: {e}")
+            return False
+
+        try:
+            archives = [self._open_archive(fp[0], header_offset, sector_size, archive_tables)
+                        for (fp, header_offset, sector_size, _, _), archive_tables
+                        in zip(cached_archives, tables)]
+        except (OSError, ValueError) as e:
+            print(f"Ignoring MPQ index cache: {e}")
+            return False
+
+        index = {}
+        keys = [self.normalize_path(name) for name in names]
+        for key, name, (archive_idx, offset, archived_size, size, flags) in zip(keys, names, rows):
+            index[key] = MpqFileEntry(archives[archive_idx], name, MpqBlock(offset, archived_size, size, flags))
+
+        overrides = {}
+        for row, archive_idx in override_rows:
+            overrides.setdefault(keys[row], []).append(archive_idx)
+
+        self.archives = archives
+        self.file_index = index
+        self.overrides = overrides
+        self.imported_listfiles = imported_listfiles
+        print(f"Restored {len(index)} indexed files across {len(archives)} archives from cache.")
+        return True
+
+    def _save_index_cache(self):
+        """
+        Writes the merged index to INDEX_CACHE_FILE.
+        Entries whose block could not be resolved are skipped; the cache holds offsets, sizes and flags.
+        Layout: header, archive records (fingerprint + header location + table sizes),
+        imported listfile fingerprints, '\\n'-joined names, entry rows,
+        override rows (entry row, shadowed archive), then each archive's packed hash and block tables.
+        """
+        if not self.archives:
+            return
+
+        archive_ids = {id(archive): i for i, archive in enumerate(self.archives)}
+        names = []
+        rows = bytearray()
+        override_rows = bytearray()
+        override_count = 0
+        for key, entry in self.file_index.items():
+            if entry.block is None:
+                continue
+            for archive_idx in self.overrides.get(key, ()):
+                override_rows += _CACHE_OVERRIDE.pack(len(names), archive_idx)
+                override_count += 1
+            names.append(entry.name)
+            rows += _CACHE_ENTRY.pack(archive_ids[id(entry.archive)], entry.block.offset,
+                                      entry.block.archived_size, entry.block.size, entry.block.flags)
+
+        names_blob = '\n'.join(names).encode('utf-8')
+        out = bytearray(_CACHE_HEADER.pack(_CACHE_MAGIC, INDEX_CACHE_VERSION, len(self.archives),
+                                           len(names), len(names_blob), override_count,
+                                           len(self.imported_listfiles)))
+        tables = [pack_tables(*archive.tables()) for archive in self.archives]
+        for archive, (hash_rows, block_rows) in zip(self.archives, tables):
+            path_bytes = archive.path.encode('utf-8')
+            size, mtime_ns = self.archive_fingerprint(archive.path)
+            out += _CACHE_ARCHIVE.pack(len(path_bytes), size, mtime_ns, archive.offset, archive.sector_size,
+                                       len(hash_rows) // TABLE_HASH_ROW.size,
+                                       len(block_rows) // TABLE_BLOCK_ROW.size)
+            out += path_bytes
+        for path, (size, mtime_ns) in self.imported_listfiles.items():
+            path_bytes = path.encode('utf-8')
+            out += _CACHE_LISTFILE.pack(len(path_bytes), size, mtime_ns)
+            out += path_bytes
+        out += names_blob
+        out += rows
+        out += override_rows
+        for hash_rows, block_rows in tables:
+            out += hash_rows
+            out += block_rows
+
+        try:
+            os.makedirs(os.path.dirname(self.INDEX_CACHE_FILE), exist_ok=True)
+            tmp_path = self.INDEX_CACHE_FILE + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(out)
+            os.replace(tmp_path, self.INDEX_CACHE_FILE)
+            print(f"Saved MPQ index cache ({len(names)} files).")
+        except OSError as e:
+            print(f"Error saving MPQ index cache: {e}")
+
+    # --- Listfile Import ---
+
+    def import_listfile(self, path: str) -> int:
+        """
+        Merges an external (community) listfile into the index so files missing from the
+        archive listfiles become searchable. Lines are internal paths, optionally prefixed
+        with an id ("123;World\\Foo.blp"). New paths go through the same bulk hashing as
+        _build_index; paths no archive contains are dropped.
+        Returns the number of newly indexed files.
+        """
+        with self._init_lock:
+            try:
+                fingerprint = self.archive_fingerprint(path)
+                if self.imported_listfiles.get(path) == fingerprint:
+                    return 0
+                with open(path, 'rb') as f:
+                    text = f.read().decode('utf-8', errors='replace')
+            except OSError as e:
+                print(f"Error reading listfile {path}: {e}")
+                return 0
+
+            names = []
+            keys = []
+            seen = set(self.file_index)
+            for line in text.splitlines():
+                name = line.rpartition(';')[2].strip().replace('/', '\\')
+                key = name.lower()
+                if name and key not in seen:
+                    seen.add(key)
+                    names.append(name)
+                    keys.append(key)
+
+            added = self._merge_names(names, keys)
+            self.imported_listfiles[path] = fingerprint
+            print(f"Imported {added} of {len(names)} new listfile paths from {os.path.basename(path)}.")
+            self._save_index_cache()
+            return added
+
+    def _locate(self, internal_path: str, key: str) -> Optional[MpqFileEntry]:
+        """
+        Finds the winning entry for a path that is missing from the listfiles
+        (or whose listed archive turned out not to contain it) by probing each archive's hash table.
+        """
+        name = internal_path.replace('/', '\\')
+        for archive in self.archives:
+            block = archive.find_block(name)
+            if block is not None:
+                entry = MpqFileEntry(archive, name, block)
+                self.file_index[key] = entry
+                return entry
+        return None
+
+    def _resolve(self, internal_path: str, key: str) -> Optional[MpqFileEntry]:
+        """Returns the winning entry for a normalized key, with its block resolved, or None."""
+        if key in self._missing:
+            return None
+
+        entry = self.file_index.get(key)
+        if entry is not None and entry.block is None:
+            entry.block = entry.archive.find_block(entry.name)
+            if entry.block is None:
+                # Stale listfile entry; fall back to hash probing.
+                entry = None
+        if entry is None:
+            entry = self._locate(internal_path, key)
+        if entry is None:
+            print(f"DEBUG: Failed to find {internal_path} in any archive.")
+            self._missing.add(key)
+        return entry
+
+    def resolve(self, internal_path: str) -> Optional[MpqFileEntry]:
+        """Returns the patch-priority winner for a path (archive, listed name, block) or None."""
+        return self._resolve(internal_path, self.normalize_path(internal_path))
+
+    def read_file(self, internal_path: str, cache: bool = True) -> Optional[BytesLike]:
         """
         Reads a file from the loaded archives.
-        Normalizes path separators and tries multiple cases to avoid missing files.
-        Returns raw bytes or None.
+        Resolves the path through the merged index, so a lookup is a single dict hit,
+        and serves repeat reads from the decompressed file cache.
+        cache=False keeps one-shot reads of large files (e.g. DBCs) out of that cache.
+        Returns the file contents (bytes, or a memoryview with the native backend) or None.
         """
         if not self.archives:
             print("Warning: No MPQ archives loaded.")
             return None
-            
-        # Generate permutations to beat the Hash Lookup
-        candidates = [
-            internal_path,                                      # As requested
-            internal_path.replace('/', '\\'),                   # Backslashes (WoW Standard)
-            internal_path.replace('\\', '/'),                   # Forward Slashes
-            internal_path.lower(),                              # Lowercase
-            internal_path.upper(),                              # Uppercase
-            internal_path.lower().replace('/', '\\'),           # Lower + Backslash
-        ]
-        
-        for archive in self.archives:
-            for candidate in candidates:
-                try:
-                    # Try to read
-                    file_data = archive.read_file(candidate)
-                    if file_data:
-                        print(f"DEBUG: Found {internal_path} as {candidate} in archive.")
-                        return file_data
-                except:
-                    pass
-        
-        print(f"DEBUG: Failed to find {internal_path} in any archive.")
-        return None
 
-    def search_files(self, pattern: str) -> List[str]:
+        key = self.normalize_path(internal_path)
+        data = self.file_cache.get(key)
+        if data is not None:
+            return data
+
+        entry = self._resolve(internal_path, key)
+        if entry is None:
+            return None
+        return self._read_entry(internal_path, key, entry, cache)
+
+    def _read_entry(self, internal_path: str, key: str, entry: MpqFileEntry,
+                    cache: bool = True) -> Optional[BytesLike]:
+        try:
+            data = entry.archive.read_block(entry.block)
+        except Exception as e:
+            print(f"Failed to read {internal_path} from {entry.archive.name}: {e}")
+            return None
+
+        if data is not None and cache:
+            self.file_cache.put(key, data)
+        return data
+
+    def source_fingerprints(self, internal_path: str) -> List[Tuple[str, int, int]]:
         """
-        Searches all loaded archives for files matching the pattern (case-insensitive substring).
-        Returns a list of matching filenames.
+        (path, size, mtime_ns) of the archive a file is read from and of every archive with higher priority:
+        everything that decides what read_file() returns. Data derived from the file stays valid while
+        this list is unchanged. Empty if the file is not in any archive.
         """
-        results = set()
-        pattern = pattern.lower()
-        
+        if not self.archives:
+            return []
+        entry = self._resolve(internal_path, self.normalize_path(internal_path))
+        if entry is None:
+            return []
+        chain = []
         for archive in self.archives:
-            # mpyq archive.files is a list of bytes
-            if not hasattr(archive, 'files') or not archive.files:
+            chain.append((archive.path, *self.archive_fingerprint(archive.path)))
+            if archive is entry.archive:
+                break
+        return chain
+
+    def open(self, internal_path: str) -> Optional[MpqFileStream]:
+        """
+        Opens a file as a seekable, read-only stream that inflates sectors on demand.
+        Use this when only part of a file is needed (e.g. an M2 header).
+        Returns None if the file is missing or uses an unsupported encoding.
+        """
+        if not self.archives:
+            print("Warning: No MPQ archives loaded.")
+            return None
+
+        entry = self._resolve(internal_path, self.normalize_path(internal_path))
+        if entry is None:
+            return None
+        if entry.block.flags & (MPQ_FILE_ENCRYPTED | MPQ_FILE_IMPLODE):
+            print(f"Cannot stream {internal_path}: encrypted or imploded files are not supported.")
+            return None
+        return MpqFileStream(entry.archive, entry.block)
+
+    def iter_files(self, paths: List[str]) -> Iterator[Tuple[str, Optional[BytesLike]]]:
+        """
+        Batch read. Yields (path, data) pairs as each file completes.
+        All paths are resolved up front; cached files come first, then the rest are read
+        archive by archive in on-disk offset order so access is sequential. Missing files yield None.
+        """
+        if not self.archives:
+            print("Warning: No MPQ archives loaded.")
+            for path in paths:
+                yield path, None
+            return
+
+        pending: Dict[int, list] = {}
+        for path in dict.fromkeys(paths):
+            key = self.normalize_path(path)
+            data = self.file_cache.get(key)
+            if data is not None:
+                yield path, data
+                continue
+            entry = self._resolve(path, key)
+            if entry is None:
+                yield path, None
                 continue
-                
-            for filename_bytes in archive.files:
-                try:
-                    filename = filename_bytes.decode('utf-8')
-                    if pattern in filename.lower():
-                        results.add(filename)
-                except UnicodeDecodeError:
-                    continue
-                    
-        return sorted(list(results))
+            pending.setdefault(id(entry.archive), []).append((entry.block.offset, path, key, entry))
+
+        for group in pending.values():
+            group.sort(key=lambda item: item[0])
+            for _, path, key, entry in group:
+                yield path, self._read_entry(path, key, entry)
+
+    def read_files(self, paths: List[str]) -> Dict[str, Optional[BytesLike]]:
+        """Batch read of several files (see iter_files). Returns {path: data or None}."""
+        return dict(self.iter_files(paths))
+
+    def set_cache_budget(self, max_bytes: int):
+        """Sets the decompressed file cache budget in bytes (0 disables caching)."""
+        self.file_cache.set_budget(max_bytes)
+
+    def set_parallel_threshold(self, min_bytes: int):
+        """Sets the file size from which compressed sectors are inflated on a thread pool."""
+        MpqReader.parallel_threshold = max(0, min_bytes)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction counters and current usage of the decompressed file cache."""
+        return self.file_cache.stats()
+
+    def _get_name_table(self) -> FrontCodedTable:
+        """
+        Builds the sorted, front-coded table of normalized index paths on first use (for list_directory).
+        Random access decodes a bucket, so search uses its own plain key list instead.
+        """
+        if self._name_table is None:
+            self._name_table = FrontCodedTable(self.file_index)
+        return self._name_table
+
+    def _get_search_index(self) -> PathSearchIndex:
+        """Builds the search index over the normalized index paths on first use."""
+        if self._search_index is None:
+            self._search_index = PathSearchIndex(self.file_index)
+        return self._search_index
+
+    def search_files(self, pattern: str, limit: int = 500) -> List[str]:
+        """
+        Searches all loaded archives for files matching the pattern (case-insensitive substring).
+        Returns up to limit matching filenames, best matches first: exact file name, file name prefix,
+        other file name matches, directory matches; shorter paths first within each.
+        """
+        pattern = self.normalize_path(pattern)
+        if not pattern:
+            return []
+
+        index = self._get_search_index()
+        keys = index.keys
+        return [self.file_index[keys[key_id]].name for key_id in index.search(pattern, limit)]
+
+    def list_directory(self, path: str = "") -> Tuple[List[str], List[str]]:
+        """
+        Lists one directory level of the merged archives, e.g. list_directory("Creature\\Dragon").
+        Returns (subdirectory names, full file paths), both sorted case-insensitively,
+        using the casing of the listfiles. Empty path lists the root.
+        """
+        prefix = self.normalize_path(path).strip('\\')
+        if prefix:
+            prefix += '\\'
+
+        table = self._get_name_table()
+        dirs, files = table.list_dir(prefix)
+
+        def display(index: int, start: int, end: int) -> str:
+            # Take the casing from the first file under the directory when it lines up with the key.
+            name = self.file_index[table[index]].name
+            return name[start:end] if len(name) >= end else table[index][start:end]
+
+        subdirs = [display(index, len(prefix), len(prefix) + len(child)) for child, index in dirs]
+        return subdirs, [self.file_index[key].name for key in files]
+
+    # --- Async API ---
+    # Futures resolve on a worker thread; UI code should deliver them to the
+    # GUI thread through src.ui.components.mpq_loader.MpqTaskRunner.
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Runs fn(*args, **kwargs) on the MPQ worker pool and returns its Future."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mpq-io")
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def initialize_async(self) -> Future:
+        """initialize_from_config() on the worker pool. Result: bool."""
+        return self.submit(self.initialize_from_config)
+
+    def read_file_async(self, internal_path: str) -> Future:
+        """read_file() on the worker pool (initializing from config first if needed)."""
+        return self.submit(self._ensure_then, self.read_file, internal_path)
+
+    def read_files_async(self, paths: List[str]) -> Future:
+        """read_files() on the worker pool (initializing from config first if needed)."""
+        return self.submit(self._ensure_then, self.read_files, paths)
+
+    def search_files_async(self, pattern: str, limit: int = 500) -> Future:
+        """search_files() on the worker pool (initializing from config first if needed)."""
+        return self.submit(self._ensure_then, self.search_files, pattern, limit)
+
+    def list_directory_async(self, path: str = "") -> Future:
+        """list_directory() on the worker pool (initializing from config first if needed)."""
+        return self.submit(self._ensure_then, self.list_directory, path)
+
+    def ensure_initialized(self) -> bool:
+        """
+        Initializes from config if that has not happened yet.
+        Taking the lock also waits out an initialize() running on another thread.
+        """
+        with self._init_lock:
+            if self.client_path:
+                return True
+            return self.initialize_from_config()
+
+    def _ensure_then(self, fn, *args):
+        self.ensure_initialized()
+        return fn(*args)
 
     def debug_list_files(self, filter_str: str):
         """
@@ -0,0 +1,47 @@
+from concurrent.futures import Future
+from PySide6.QtCore import QObject, Signal
+from src.core.data_manager import DataManager
+
+
+class DataTableWatcher(QObject):
+    """
+    Delivers DataManager table readiness to the GUI thread via signals.
+    watch(name) emits ready(name, table) once the current load of that table finishes,
+    immediately if it already has. Several tables can be watched at once.
+    """
+    ready = Signal(str, object)
+
+    # Emitted from the loader thread; queued to the GUI thread because the watcher lives there.
+    _completed = Signal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending = {}
+        self._completed.connect(self._on_completed)
+
+    def watch(self, name: str):
+        """Emits ready(name, table) when table name is loaded. Watching it again supersedes the previous watch."""
+        future = DataManager().table_future(name)
+        self._pending[name] = future
+        future.add_done_callback(lambda f: self._notify(name, f))
+
+    def cancel(self):
+        """Drops every pending notification."""
+        self._pending.clear()
+
+    def _notify(self, name: str, future: Future):
+        try:
+            self._completed.emit(name, future)
+        except RuntimeError:
+            pass # Watcher was deleted while the table loaded
+
+    def _on_completed(self, name: str, future: Future):
+        if self._pending.get(name) is not future:
+            return
+        del self._pending[name]
+
+        error = future.exception()
+        if error is not None:
+            print(f"DBC load failed for {name}: {error}")
+            return
+        self.ready.emit(name, future.result())
@@ -16,6 +16,7 @@ except ImportError:
     print("Panda3D not available.")
 
 from src.core.mpq_manager import MpqManager
+from src.ui.components.mpq_loader import MpqTaskRunner
 from src.utils.m2_parser import M2Parser
 from src.utils.skin_parser import SkinParser
 from src.utils.blp_converter import BlpConverter
@@ -36,6 +37,10 @@ class Panda3DWidget(QWidget):
         self.is_initialized = False
         self.pivot = None
         
+        # MPQ reads and parsing run off the GUI thread; results arrive via apply_model.
+        self.loader = MpqTaskRunner(self)
+        self.loader.finished.connect(self.apply_model)
+        
         if PANDA_AVAILABLE:
             # We defer initialization until we are sure the window has an XID
             # usually showEvent or a slightly longer timer
@@ -189,46 +194,59 @@ class Panda3DWidget(QWidget):
             print("Viewer not ready.")
             return
 
+        # Starting a new load supersedes one still in flight, so a stale model never renders.
+        self.loader.start(MpqManager().submit(self.fetch_model, m2_path, texture_path))
+
+    def fetch_model(self, m2_path: str, texture_path: str = None):
+        """
+        Runs on the MPQ worker pool: reads the M2, skin and texture and parses them.
+        Returns {'vertices', 'texture' (BLP info or None), 'skin' ((indices, triangles) or None)}
+        or None if the model could not be loaded. Touches no Qt or Panda3D objects.
+        """
         mpq = MpqManager()
-        if not mpq.client_path:
-             from src.core.config_manager import ConfigManager
-             cm = ConfigManager()
-             client_path = cm.config.get("wow_client_path") 
-             if client_path:
-                 mpq.initialize(client_path)
-             else:
-                 print("WoW Client Path not configured.")
-                 return
+        if not mpq.ensure_initialized():
+             return None
 
         # 1. Read M2 File
         print(f"Loading M2: {m2_path}")
         m2_data = mpq.read_file(m2_path)
         if not m2_data:
             print(f"Could not find file: {m2_path}")
-            return
+            return None
             
         parser = M2Parser()
         vertices = parser.parse_geometry(m2_data)
         
         if not vertices:
             print("No vertices found.")
-            return
+            return None
 
-        # 2. Textures
+        # 2. Dependencies
+        # Rules: replace .m2/M2 with 00.skin (MpqManager lookups are case-insensitive).
+        base_path_lower = m2_path.lower()
+        if base_path_lower.endswith('.m2'):
+            skin_path_candidate = m2_path[:-3] + "00.skin"
+        else:
+            skin_path_candidate = m2_path + "00.skin"
+
+        # Skin plus the primary texture candidates are fetched in one batch read.
+        internal_tex = parser.parse_textures(m2_data)
+        print(f"Loading Skin: {skin_path_candidate}")
+        deps = mpq.read_files([p for p in (skin_path_candidate, texture_path, internal_tex) if p])
+
+        # 3. Textures
         tex_data = None
-        
+
         # A. Try requested path (DBC)
         if texture_path:
              print(f"Loading requested texture: {texture_path}")
-             tex_data = mpq.read_file(texture_path)
+             tex_data = deps.get(texture_path)
 
         # B. Try internal parsing (Type 0)
-        if not tex_data:
-             internal_tex = parser.parse_textures(m2_data)
-             if internal_tex:
-                 print(f"Loading internal texture (Type 0): {internal_tex}")
-                 tex_data = mpq.read_file(internal_tex)
-        
+        if not tex_data and internal_tex:
+             print(f"Loading internal texture (Type 0): {internal_tex}")
+             tex_data = deps.get(internal_tex)
+
         # C. Try Regex Internal Scan
         if not tex_data:
              print("DEBUG: Primary texture failed. Scanning M2 for internal textures...")
@@ -255,91 +273,93 @@ class Panda3DWidget(QWidget):
                  
                  print(f"DEBUG: Sorted Textures: {internal_list}")
 
+                 # Fetch all candidates in one batch, then take the best-scored hit
+                 candidates = mpq.read_files(internal_list)
                  for int_tex in internal_list:
-                     print(f"DEBUG: Trying internal texture: {int_tex}")
-                     tex_data = mpq.read_file(int_tex)
+                     tex_data = candidates.get(int_tex)
                      if tex_data:
                          print(f"SUCCESS: Loaded internal texture {int_tex}")
                          break
 
         print(f"DEBUG: BLP Data Found: {len(tex_data) if tex_data else 'None'}")
              
+        tex_info = None
         if tex_data:
             converter = BlpConverter()
             # Returns (width, height, data, format)
             tex_info = converter.process_blp(tex_data)
-            if tex_info:
-                width, height, image_data, tex_fmt = tex_info
-                print(f"DEBUG: Texture Format: {tex_fmt} | Size: {width}x{height} | Data Len: {len(image_data)}")
-                
-                tex = Texture()
-                
-                # 1. Set Size
-                tex.setXSize(width)
-                tex.setYSize(height)
-                
-                # 2. Set Format FIRST (Defaults to CM_off, so must be before Compression)
-                tex.setFormat(Texture.F_rgba)
-                
-                # 3. Set Compression SECOND (Overrides format default for internal storage)
-                if tex_fmt == "DXT1":
-                    tex.setCompression(Texture.CM_dxt1)
-                elif tex_fmt == "DXT3":
-                    tex.setCompression(Texture.CM_dxt3)
-                elif tex_fmt == "DXT5":
-                    tex.setCompression(Texture.CM_dxt5)
-                else:
-                    tex.setCompression(Texture.CM_off)
-                    
-                # Debug Verification
-                print(f"DEBUG: Texture Compression Mode: {tex.getCompression()}")
-
-                # 4. Feed Data
-                # CRITICAL: Must pass compression mode here, otherwise it defaults to CM_off and fails assertion
-                tex.setRamImage(image_data, tex.getCompression())
-                
-                # Apply to Node (will apply after mesh generation)
-                self.pending_texture = tex
-            else:
+            if not tex_info:
                 print("Failed to convert BLP.")
-                self.pending_texture = None
         else:
             print("No Texture found (Hardcoded or DBC).")
-            self.pending_texture = None
 
-        # 3. Read Skin File
-        # Try finding the corresponding skin file
-        # Rules: replace .m2/M2 with 00.skin
-        # M2 paths are often mixed case.
-        # Try constructing skin path and using search?
-        
-        # Simple string replacement first
-        base_path_lower = m2_path.lower()
-        if base_path_lower.endswith('.m2'):
-            skin_path_candidate = m2_path[:-3] + "00.skin"
-        else:
-            skin_path_candidate = m2_path + "00.skin"
-            
-        # We need to find the ACTUAL filename in the MPQ because standard case might not match?
-        # MpqManager.read_file handles case sensitivity attempts now!
-        
-        print(f"Loading Skin: {skin_path_candidate}")
-        skin_data = mpq.read_file(skin_path_candidate)
+        # 4. Skin File
+        skin = None
+        skin_data = deps.get(skin_path_candidate)
         
         if not skin_data:
              print("Skin file not found. Falling back to Point Cloud.")
-             self.render_point_cloud(vertices)
-             return
-             
-        skin_parser = SkinParser()
-        indices_lookup, triangles = skin_parser.parse_skin(skin_data)
-        
-        if not indices_lookup or not triangles:
-             print("Failed to parse Skin. Falling back to Point Cloud.")
-             self.render_point_cloud(vertices)
-             return
-             
-        self.render_mesh(vertices, indices_lookup, triangles)
+        else:
+             skin_parser = SkinParser()
+             indices_lookup, triangles = skin_parser.parse_skin(skin_data)
+             if not indices_lookup or not triangles:
+                  print("Failed to parse Skin. Falling back to Point Cloud.")
+             else:
+                  skin = (indices_lookup, triangles)
+
+        return {
+            'vertices': vertices,
+            'texture': tex_info,
+            'skin': skin
+        }
+
+    def apply_model(self, result):
+        """GUI thread: builds the texture and renders the output of fetch_model."""
+        if not result or not self.is_initialized:
+            return
+
+        tex_info = result['texture']
+        if tex_info:
+            width, height, image_data, tex_fmt = tex_info
+            print(f"DEBUG: Texture Format: {tex_fmt} | Size: {width}x{height} | Data Len: {len(image_data)}")
+            
+            tex = Texture()
+            
+            # 1. Set Size
+            tex.setXSize(width)
+            tex.setYSize(height)
+            
+            # 2. Set Format FIRST (Defaults to CM_off, so must be before Compression)
+            tex.setFormat(Texture.F_rgba)
+            
+            # 3. Set Compression SECOND (Overrides format default for internal storage)
+            if tex_fmt == "DXT1":
+                tex.setCompression(Texture.CM_dxt1)
+            elif tex_fmt == "DXT3":
+                tex.setCompression(Texture.CM_dxt3)
+            elif tex_fmt == "DXT5":
+                tex.setCompression(Texture.CM_dxt5)
+            else:
+                tex.setCompression(Texture.CM_off)
+                
+            # Debug Verification
+            print(f"DEBUG: Texture Compression Mode: {tex.getCompression()}")
+
+            # 4. Feed Data
+            # CRITICAL: Must pass compression mode here, otherwise it defaults to CM_off and fails assertion
+            tex.setRamImage(bytes(image_data), tex.getCompression())
+            
+            # Apply to Node (will apply after mesh generation)
+            self.pending_texture = tex
+        else:
+            self.pending_texture = None
+
+        if result['skin'] is None:
+            self.render_point_cloud(result['vertices'])
+            return
+
+        indices_lookup, triangles = result['skin']
+        self.render_mesh(result['vertices'], indices_lookup, triangles)
 
     def render_point_cloud(self, vertices):
         # Clear previous
@@ -492,6 +512,7 @@ class Panda3DWidget(QWidget):
         super().closeEvent(event)
 
     def cleanup(self):
+        self.loader.cancel()
         if hasattr(self, 'timer') and self.timer.isActive():
             self.timer.stop()
             
@@ -0,0 +1,57 @@
+from concurrent.futures import Future
+from typing import Optional
+from PySide6.QtCore import QObject, Signal
+
+
+class MpqTaskRunner(QObject):
+    """
+    Delivers MpqManager futures (read_file_async, submit, ...) to the GUI thread via signals.
+    A runner tracks one task at a time: starting a new task or calling cancel() supersedes
+    the previous one, and a superseded result is dropped even if it already finished.
+    """
+    finished = Signal(object)
+    failed = Signal(str)
+
+    # Emitted from the worker thread; queued to the GUI thread because the runner lives there.
+    _completed = Signal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ticket = 0
+        self._future: Optional[Future] = None
+        self._completed.connect(self._on_completed)
+
+    def start(self, future: Future):
+        """Tracks future, superseding whatever task was running."""
+        self.cancel()
+        ticket = self._ticket
+        self._future = future
+        future.add_done_callback(lambda f: self._notify(ticket, f))
+
+    def cancel(self):
+        """Cancels the current task if it has not started and drops its result otherwise."""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self._ticket += 1
+
+    def is_running(self) -> bool:
+        return self._future is not None
+
+    def _notify(self, ticket: int, future: Future):
+        try:
+            self._completed.emit(ticket, future)
+        except RuntimeError:
+            pass # Runner was deleted while the task ran
+
+    def _on_completed(self, ticket: int, future: Future):
+        if ticket != self._ticket or future.cancelled():
+            return
+        self._future = None
+
+        error = future.exception()
+        if error is not None:
+            print(f"MPQ task failed: {error}")
+            self.failed.emit(str(error))
+            return
+        self.finished.emit(future.result())
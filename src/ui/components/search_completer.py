@@ -0,0 +1,35 @@
+from typing import List, Optional
+from PySide6.QtCore import Qt, QStringListModel
+from PySide6.QtWidgets import QComboBox, QCompleter
+from src.core.data_manager import DataManager
+
+
+class SearchCompleter(QCompleter):
+    """
+    Completer backed by DataManager.search(): typing in the line edit lists the best matching
+    "[id] label" entries of tables (typos allowed). Searches take well under a millisecond,
+    so the list is refreshed on every keystroke.
+    Usage: SearchCompleter(["factions"], parent).attach(combo)  (combo must be editable)
+    """
+
+    def __init__(self, tables: Optional[List[str]] = None, parent=None, limit: int = 50):
+        super().__init__(parent)
+        self.tables = tables
+        self.limit = limit
+        self._model = QStringListModel(self)
+        self.setModel(self._model)
+        # The results are already ranked; don't let the completer filter or re-sort them
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self.setMaxVisibleItems(15)
+
+    def attach(self, combo: QComboBox):
+        combo.setCompleter(self)
+        # textEdited: only typing searches, not selections made in code
+        combo.lineEdit().textEdited.connect(self.update_results)
+
+    def update_results(self, text: str):
+        hits = DataManager().search(text, self.tables, self.limit)
+        self._model.setStringList([f"[{hit.id}] {hit.label}" for hit in hits])
+        if hits:
+            self.complete()
@@ -2,6 +2,8 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout,
                                QLineEdit, QSpinBox, QDoubleSpinBox, QComboBox, 
                                QTextEdit, QPushButton, QGroupBox, QLabel, QMessageBox)
 from src.core.data_manager import DataManager
+from src.ui.components.data_loader import DataTableWatcher
+from src.ui.components.search_completer import SearchCompleter
 try:
     import mysql.connector
 except ImportError:
@@ -15,6 +17,12 @@ class NpcEditorDialog(QDialog):
         self.realm_config = realm_config # Strict override
         self.allowed_id_range = allowed_id_range # (start, end) strict check for deletion
         self.data_manager = DataManager()
+        # Faction and display id of the loaded NPC; selected in the combos once their tables are in
+        self.npc_faction_id = None
+        self.npc_display_id = None
+        # DBC tables may still be loading in the background
+        self.table_watcher = DataTableWatcher(self)
+        self.table_watcher.ready.connect(self.on_table_ready)
         self.init_ui()
         self.load_data() # Loads static data (factions etc)
         self.on_active_realm_changed()
@@ -87,6 +95,10 @@ class NpcEditorDialog(QDialog):
         
         self.faction_combo = QComboBox()
         self.faction_combo.setEditable(True)
+
+        # Type an ID, name or path (typos are fine) to pick from the whole table
+        SearchCompleter(["display_infos"], self).attach(self.model_combo)
+        SearchCompleter(["factions"], self).attach(self.faction_combo)
         
         identity_form.addRow("Model:", self.model_combo)
         identity_form.addRow("Faction:", self.faction_combo)
@@ -151,7 +163,21 @@ class NpcEditorDialog(QDialog):
         main_layout.addWidget(self.preview_text)
 
     def load_data(self):
-        # Populate Factions
+        # Populate each combo as soon as its table is loaded (right away if it already is)
+        self.faction_combo.clear()
+        self.faction_combo.addItem("Loading Factions...")
+        self.model_combo.clear()
+        self.model_combo.addItem("Loading Models...")
+        self.table_watcher.watch("factions")
+        self.table_watcher.watch("display_infos")
+
+    def on_table_ready(self, name, table):
+        if name == "factions":
+            self.populate_factions()
+        elif name == "display_infos":
+            self.populate_models()
+
+    def populate_factions(self):
         self.faction_combo.clear()
         if self.data_manager.factions:
             # Performance: Add all if possible, or limit
@@ -161,8 +187,9 @@ class NpcEditorDialog(QDialog):
             self.faction_combo.addItems(items)
         else:
             self.faction_combo.addItem("No Factions Loaded")
-            
-        # Populate Models
+        self.select_faction()
+
+    def populate_models(self):
         self.model_combo.clear()
         if self.data_manager.display_infos:
             # 24k items might be slow to render in a combo box at once.
@@ -171,8 +198,8 @@ class NpcEditorDialog(QDialog):
             # Let's try 1000.
             limit = 0
             items = []
-            for cid, model_id in self.data_manager.display_infos.items():
-                items.append(f"[{cid}] Model {model_id}")
+            for cid, model, texture in self.data_manager.display_infos.rows(0, 1001):
+                items.append(f"[{cid}] {model}")
                 limit += 1
                 if limit > 1000:
                     items.append("... (Load more logic needed for full list)")
@@ -180,6 +207,25 @@ class NpcEditorDialog(QDialog):
             self.model_combo.addItems(items)
         else:
             self.model_combo.addItem("No Models Loaded")
+        self.select_model()
+
+    def select_faction(self):
+        if self.npc_faction_id is not None and self.data_manager.is_ready("factions"):
+            name = self.data_manager.factions.get(self.npc_faction_id, "")
+            self.select_entry(self.faction_combo, self.npc_faction_id, name)
+
+    def select_model(self):
+        if self.npc_display_id is not None and self.data_manager.is_ready("display_infos"):
+            model = self.data_manager.display_infos.model(self.npc_display_id) or ""
+            self.select_entry(self.model_combo, self.npc_display_id, model)
+
+    def select_entry(self, combo, entry_id, label):
+        """Selects the "[entry_id] ..." item, or shows it as the edit text if the combo doesn't list it."""
+        for i in range(combo.count()):
+            if combo.itemText(i).startswith(f"[{entry_id}]"):
+                combo.setCurrentIndex(i)
+                return
+        combo.setEditText(f"[{entry_id}] {label}".strip())
 
     def load_npc_data(self):
         if not self.predefined_id or not mysql:
@@ -222,19 +268,12 @@ class NpcEditorDialog(QDialog):
                 self.level_spin.setValue(row['minlevel']) # Assuming min=max for now
                 self.hp_mod_spin.setValue(row.get('HealthModifier', 1.0))
                 
-                # Faction
-                fid = row.get('faction', 35)
-                for i in range(self.faction_combo.count()):
-                    if self.faction_combo.itemText(i).startswith(f"[{fid}]"):
-                        self.faction_combo.setCurrentIndex(i)
-                        break
-                
-                # Model
-                mid = model_row['CreatureDisplayID'] if model_row else 0
-                for i in range(self.model_combo.count()):
-                    if self.model_combo.itemText(i).startswith(f"[{mid}]"):
-                        self.model_combo.setCurrentIndex(i)
-                        break
+                # Faction and model: the combos may still be waiting for their tables,
+                # in which case populate_factions/populate_models select them later
+                self.npc_faction_id = row.get('faction', 35)
+                self.select_faction()
+                self.npc_display_id = model_row['CreatureDisplayID'] if model_row else 0
+                self.select_model()
 
                 # Rank
                 rank = row.get('rank', 0)
@@ -364,14 +364,16 @@ class SettingsWindow(QDialog):
         QMessageBox.information(self, "Sync Complete", f"Found {len(new_realms)} realms from database.")
 
     def save_and_close(self):
-        old_path = self.config_manager.config.get("client_data_path", "")
+        data_keys = ("client_data_path", "wow_client_path")
+        old_paths = [self.config_manager.config.get(key, "") for key in data_keys]
         self.update_global_config_from_ui()
         self.config_manager.save_config(self.local_config)
         self.config_saved.emit()
         
-        new_path = self.local_config.get("client_data_path", "")
-        if new_path != old_path:
-             print("Client Data Path changed. Reloading data...")
-             DataManager().load_data()
+        new_paths = [self.local_config.get(key, "") for key in data_keys]
+        if new_paths != old_paths:
+             # Incremental and in the background: only DBCs that now resolve differently are re-read
+             print("DBC paths changed. Reloading data...")
+             DataManager().load_async()
              
         self.accept()
@@ -1,7 +1,10 @@
 from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QLineEdit, QPushButton, QHBoxLayout, QListWidget, QListWidgetItem
 from PySide6.QtCore import Qt
 from src.ui.components.model_viewer import Panda3DWidget
+from src.ui.components.mpq_loader import MpqTaskRunner
+from src.ui.components.data_loader import DataTableWatcher
 from src.core.data_manager import DataManager
+from src.core.mpq_manager import MpqManager
 
 class ModelViewerWindow(QMainWindow):
     def __init__(self, parent=None):
@@ -28,8 +31,16 @@ class ModelViewerWindow(QMainWindow):
         self.search_btn = QPushButton("Search DBC")
         self.search_btn.clicked.connect(self.search_dbc)
         
+        self.search_mpq_btn = QPushButton("Search MPQ")
+        self.search_mpq_btn.clicked.connect(self.search_mpq)
+        
+        self.browse_mpq_btn = QPushButton("Browse MPQ")
+        self.browse_mpq_btn.clicked.connect(self.browse_mpq)
+        
         btn_layout.addWidget(self.load_btn)
         btn_layout.addWidget(self.search_btn)
+        btn_layout.addWidget(self.search_mpq_btn)
+        btn_layout.addWidget(self.browse_mpq_btn)
         
         c_layout.addWidget(self.path_input)
         c_layout.addLayout(btn_layout)
@@ -43,6 +54,18 @@ class ModelViewerWindow(QMainWindow):
         
         layout.addWidget(controls)
         
+        # MPQ search runs on the MPQ worker pool (archives may still be opening)
+        self.mpq_search = MpqTaskRunner(self)
+        self.mpq_search.finished.connect(self.on_mpq_search_finished)
+        self.mpq_browse = MpqTaskRunner(self)
+        self.mpq_browse.finished.connect(self.on_mpq_browse_finished)
+        self.browse_path = ""
+        
+        # DBC search waits for the display info table if it is still loading
+        self.dbc_watcher = DataTableWatcher(self)
+        self.dbc_watcher.ready.connect(self.on_dbc_table_ready)
+        self.dbc_term = ""
+        
         # Viewer
         # Check if Panda is available
         try:
@@ -64,12 +87,23 @@ class ModelViewerWindow(QMainWindow):
             return
             
         dm = DataManager()
-        # Ensure data is loaded
-        if not dm.display_infos:
-            dm.load_data()
+        # Nothing loaded (e.g. client path set since startup): reload in the background
+        if dm.is_ready("display_infos") and not dm.display_infos:
+            dm.load_async()
             
-        results = dm.search_models(term)
-        
+        self.dbc_term = term
+        if not dm.is_ready("display_infos"):
+            self.result_list.clear()
+            self.result_list.setVisible(True)
+            self.result_list.addItem("Loading DBC data...")
+            self.dbc_watcher.watch("display_infos")
+            return
+        self.show_dbc_results(dm.search_models(term))
+
+    def on_dbc_table_ready(self, name, table):
+        self.show_dbc_results(DataManager().search_models(self.dbc_term))
+
+    def show_dbc_results(self, results):
         self.result_list.clear()
         if results:
             self.result_list.setVisible(True)
@@ -90,24 +124,18 @@ class ModelViewerWindow(QMainWindow):
             self.result_list.addItem("No results found in DBC.")
 
     def search_mpq(self):
-        from src.core.mpq_manager import MpqManager
         term = self.path_input.text()
         if not term:
             return
             
-        # Ensure MPQ is init (via viewer or manually)
-        # Viewer inits MPQ on load... we might need to trigger init if not loaded.
-        # But MpqManager is singleton. 
-        mpq = MpqManager()
-        if not mpq.archives:
-             # Try forcing init via viewer logic or getting config
-             from src.core.config_manager import ConfigManager
-             cm = ConfigManager()
-             path = cm.config.get("wow_client_path")
-             if path:
-                 mpq.initialize(path)
-        
-        results = mpq.search_files(term)
+        # MpqManager initializes itself from config on the worker if needed.
+        self.mpq_browse.cancel()
+        self.result_list.clear()
+        self.result_list.setVisible(True)
+        self.result_list.addItem("Searching MPQ archives...")
+        self.mpq_search.start(MpqManager().search_files_async(term))
+
+    def on_mpq_search_finished(self, results):
         self.result_list.clear()
         if results:
             self.result_list.setVisible(True)
@@ -117,9 +145,46 @@ class ModelViewerWindow(QMainWindow):
             self.result_list.setVisible(True)
             self.result_list.addItem("No results found.")
 
+    def browse_mpq(self):
+        # Browse the folder of the current path (the path itself if it ends with a separator)
+        term = self.path_input.text().replace('/', '\\')
+        self.open_directory(term.rpartition('\\')[0])
+
+    def open_directory(self, path):
+        self.browse_path = path.strip('\\')
+        self.mpq_search.cancel()
+        self.result_list.clear()
+        self.result_list.setVisible(True)
+        self.result_list.addItem("Listing MPQ directory...")
+        self.mpq_browse.start(MpqManager().list_directory_async(self.browse_path))
+
+    def on_mpq_browse_finished(self, listing):
+        dirs, files = listing
+        self.result_list.clear()
+        self.result_list.setVisible(True)
+        
+        if self.browse_path:
+            item = QListWidgetItem("..")
+            item.setData(Qt.UserRole, {'dir': self.browse_path.rpartition('\\')[0]})
+            self.result_list.addItem(item)
+        
+        prefix = self.browse_path + '\\' if self.browse_path else ""
+        for d in dirs:
+            item = QListWidgetItem(d + '\\')
+            item.setData(Qt.UserRole, {'dir': prefix + d})
+            self.result_list.addItem(item)
+        for f in files:
+            self.result_list.addItem(f)
+        
+        if not dirs and not files:
+            self.result_list.addItem("Directory is empty.")
+
     def on_result_clicked(self, item):
         data = item.data(Qt.UserRole)
-        if data:
+        if data and 'dir' in data:
+            self.path_input.setText(data['dir'] + '\\' if data['dir'] else "")
+            self.open_directory(data['dir'])
+        elif data:
             self.path_input.setText(data['model'])
             self.viewer.load_model(data['model'], texture_path=data['texture'])
         else:
@@ -128,6 +193,9 @@ class ModelViewerWindow(QMainWindow):
             self.load_model()
 
     def closeEvent(self, event):
+        self.dbc_watcher.cancel()
+        self.mpq_search.cancel()
+        self.mpq_browse.cancel()
         if self.viewer:
             self.viewer.cleanup()
             self.viewer.close() # Ensure widget close event fires too
@@ -0,0 +1,78 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from src.utils.dbc_parser import STRINGS_SUFFIX
+
+
+class ColumnStore:
+    """
+    A column-projected table (e.g. DBCParser.read_spell_dbc output) sorted by its key column.
+    Numeric columns are typed arrays, usually read-only views on the DBC cache mapping; string columns
+    are interned: a uint32 index array plus the table of distinct strings ("<field>.strings").
+    Rows are found by binary search on the key, and only the requested fields are materialized.
+    """
+
+    def __init__(self, columns: Optional[Dict] = None, key: str = "ID"):
+        columns = columns or {}
+        self.key = key
+        self.ids = columns.get(key, np.zeros(0, dtype=np.uint32))
+        self.numeric: Dict[str, np.ndarray] = {}
+        self.strings: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        for name, values in columns.items():
+            if name.endswith(STRINGS_SUFFIX):
+                continue
+            if name + STRINGS_SUFFIX in columns:
+                self.strings[name] = (values, columns[name + STRINGS_SUFFIX])
+            else:
+                self.numeric[name] = values
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.numeric) + list(self.strings)
+
+    def row(self, key) -> Optional[int]:
+        """Position of the record with this key, or None."""
+        if not isinstance(key, (int, np.integer)) or not 0 <= key <= 0xFFFFFFFF:
+            return None
+        pos = int(np.searchsorted(self.ids, key))
+        if pos < len(self.ids) and self.ids[pos] == key:
+            return pos
+        return None
+
+    def value(self, key, field: str):
+        """One field of one record (None if the record does not exist)."""
+        pos = self.row(key)
+        if pos is None:
+            return None
+        if field in self.strings:
+            index, strings = self.strings[field]
+            return strings[index[pos]]
+        return self.numeric[field][pos].item()
+
+    def get(self, key, fields: Optional[List[str]] = None) -> Optional[dict]:
+        """The record with this key as {field: value} (all fields by default), or None."""
+        pos = self.row(key)
+        if pos is None:
+            return None
+        record = {}
+        for field in fields or self.fields:
+            if field in self.strings:
+                index, strings = self.strings[field]
+                record[field] = strings[index[pos]]
+            else:
+                record[field] = self.numeric[field][pos].item()
+        return record
+
+    def column(self, field: str) -> np.ndarray:
+        """A numeric column, or the index column of a string field."""
+        if field in self.strings:
+            return self.strings[field][0]
+        return self.numeric[field]
+
+    def __contains__(self, key) -> bool:
+        return self.row(key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,137 @@
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from src.utils.dbc_parser import PARSER_VERSION
+
+# Cache file format. Bump CACHE_FORMAT_VERSION whenever the layout changes;
+# PARSER_VERSION (dbc_parser) covers changes to what the readers extract.
+CACHE_FORMAT_VERSION = 2
+_MAGIC = b'AFDC'
+_HEADER = struct.Struct('<4sIIII')   # magic, format version, parser version, source count, column count
+_SOURCE = struct.Struct('<HQQ')      # path length, size, mtime_ns (path bytes follow)
+_COLUMN = struct.Struct('<HBxxxQQ')  # name length, kind, row count, data size (name bytes follow)
+_KIND_STRINGS = 1
+# Numeric column kinds (4-byte little-endian values)
+_NUMERIC_KINDS = {0: np.dtype('<u4'), 2: np.dtype('<i4'), 3: np.dtype('<f4')}
+_KIND_OF_DTYPE = {dtype: kind for kind, dtype in _NUMERIC_KINDS.items()}
+
+# A source is (path, size, mtime_ns); any change invalidates the cached table.
+Source = Tuple[str, int, int]
+Column = Union[np.ndarray, List[str]]
+
+
+def file_source(path: str) -> Source:
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime_ns
+
+
+class DBCCache:
+    """
+    Binary cache of tables derived from DBC files, one file per table under cache_dir.
+    A table is a set of named columns: uint32/int32/float32 arrays or lists of strings (lengths may differ,
+    e.g. index columns next to the string table they point into).
+    Entries are keyed by the (path, size, mtime) of every source file and by the parser version.
+    Loading memory-maps the file: numeric columns are returned as views on the mapping,
+    string columns are decoded from one NUL-joined blob.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join("data", "dbc_cache")):
+        self.cache_dir = cache_dir
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.bin")
+
+    def load(self, name: str, sources: Sequence[Source]) -> Optional[Dict[str, Column]]:
+        """Returns the cached columns of table name, or None if missing or stale."""
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring DBC cache {path}: {e}")
+            return None
+
+        try:
+            columns = self._read_columns(mm, sources)
+        except (ValueError, struct.error, UnicodeDecodeError) as e:
+            print(f"Ignoring DBC cache {path}: {e}")
+            columns = None
+        if columns is None:
+            # Nothing references the mapping unless the columns are handed out
+            try:
+                mm.close()
+            except BufferError:
+                pass
+        return columns
+
+    @staticmethod
+    def _read_columns(mm: mmap.mmap, sources: Sequence[Source]) -> Optional[Dict[str, Column]]:
+        """Columns of a mapped cache file, or None if it was written by another version or for other sources."""
+        magic, version, parser_version, source_count, column_count = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC or version != CACHE_FORMAT_VERSION or parser_version != PARSER_VERSION:
+            return None
+
+        pos = _HEADER.size
+        cached_sources = []
+        for _ in range(source_count):
+            path_len, size, mtime_ns = _SOURCE.unpack_from(mm, pos)
+            pos += _SOURCE.size
+            cached_sources.append((mm[pos:pos + path_len].decode('utf-8'), size, mtime_ns))
+            pos += path_len
+        if cached_sources != [tuple(s) for s in sources]:
+            return None
+
+        columns = {}
+        for _ in range(column_count):
+            name_len, kind, count, data_size = _COLUMN.unpack_from(mm, pos)
+            pos += _COLUMN.size
+            column_name = mm[pos:pos + name_len].decode('utf-8')
+            pos += name_len
+            pos += -pos % 4  # numeric data is 4-byte aligned
+            if kind in _NUMERIC_KINDS:
+                columns[column_name] = np.frombuffer(mm, dtype=_NUMERIC_KINDS[kind], count=count, offset=pos)
+            elif kind == _KIND_STRINGS:
+                columns[column_name] = mm[pos:pos + data_size].decode('utf-8').split('\0') if count else []
+            else:
+                raise ValueError(f"unknown column kind {kind}")
+            pos += data_size
+        return columns
+
+    def save(self, name: str, sources: Sequence[Source], columns: Dict[str, Column]):
+        """
+        Writes the columns of table name, replacing any previous entry.
+        Raises ValueError for arrays that are not uint32, int32 or float32.
+        """
+        out = bytearray(_HEADER.pack(_MAGIC, CACHE_FORMAT_VERSION, PARSER_VERSION, len(sources), len(columns)))
+        for source_path, size, mtime_ns in sources:
+            path_bytes = source_path.encode('utf-8')
+            out += _SOURCE.pack(len(path_bytes), size, mtime_ns)
+            out += path_bytes
+        for column_name, values in columns.items():
+            if isinstance(values, np.ndarray):
+                kind = _KIND_OF_DTYPE.get(values.dtype.newbyteorder('<'))
+                if kind is None:
+                    raise ValueError(f"DBC cache column {column_name} has unsupported dtype {values.dtype}")
+                data = np.ascontiguousarray(values, dtype=_NUMERIC_KINDS[kind]).tobytes()
+            else:
+                kind = _KIND_STRINGS
+                data = '\0'.join(values).encode('utf-8')
+            name_bytes = column_name.encode('utf-8')
+            out += _COLUMN.pack(len(name_bytes), kind, len(values), len(data))
+            out += name_bytes
+            out += bytes(-len(out) % 4)
+            out += data
+
+        path = self._path(name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(out)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error saving DBC cache {path}: {e}")
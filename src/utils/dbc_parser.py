@@ -1,11 +1,228 @@
-from construct import Struct, Int32ul, Const, Bytes, Array, this, Adapter
+from construct import Struct, Int32ul, Const
+import mmap
 import os
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from src.utils.dbc_schemas import DBCSchema, STRING, LOCSTRING, get_schema
+
+# Bump whenever a reader changes what it extracts; invalidates data derived from earlier parses.
+PARSER_VERSION = 2
+
+# Typed views of a 4-byte DBC field
+FIELD_DTYPES = {
+    'uint32': np.dtype('<u4'),
+    'int32': np.dtype('<i4'),
+    'float32': np.dtype('<f4'),
+}
+
+
+class DBCTable:
+    """
+    Columnar view of one DBC file (an mmap, bytes, or a memoryview such as MpqManager.read_file returns).
+    The record block is mapped as a (records, fields) uint32 matrix with np.frombuffer, without copying;
+    column() returns typed views of single fields and string fields are only decoded when asked for.
+    With a schema (looked up from the file name by default, see dbc_schemas) fields are addressed
+    by name, rows by primary key through a sorted/dense ID index, and decoded strings are memoized
+    by offset. Localized string fields resolve to the column of the table's locale (0 = enUS).
+    """
+
+    def __init__(self, data, name: str = "", schema: Optional[DBCSchema] = None, locale: int = 0):
+        self.name = name
+        self.locale = locale
+        self._data = data
+        self._string_cache: Dict[int, str] = {}
+        self._dense_index = None
+        self._sorted_keys = None
+        self._sorted_rows = None
+        header = DBCParser.Header.parse(bytes(data[:DBCParser.Header.sizeof()]))
+        self.record_count = header.record_count
+        self.field_count = header.field_count
+        self.record_size = header.record_size
+
+        records_start = DBCParser.Header.sizeof()
+        records_end = records_start + header.record_count * header.record_size
+        if header.field_count * 4 > header.record_size or records_end + header.string_block_size > len(data):
+            raise ValueError(f"Truncated or malformed DBC ({name})")
+
+        if header.record_size % 4 == 0:
+            matrix = np.frombuffer(data, dtype='<u4', count=(records_end - records_start) // 4, offset=records_start)
+            self.records = matrix.reshape(header.record_count, header.record_size // 4)[:, :header.field_count]
+        else:
+            # Records padded to an odd size: same matrix, with the row stride skipping the padding.
+            self.records = np.ndarray((header.record_count, header.field_count), dtype='<u4', buffer=data,
+                                      offset=records_start, strides=(header.record_size, 4))
+        self.string_block_size = header.string_block_size
+        if hasattr(data, 'find'):
+            self._strings = data
+            self._strings_start = records_end
+        else:
+            # memoryview (e.g. a file read from an MPQ): copy just the string block so it can be searched
+            self._strings = bytes(data[records_end:records_end + header.string_block_size])
+            self._strings_start = 0
+
+        self.schema = schema if schema is not None else get_schema(name)
+        if self.schema is not None and self.schema.field_count != self.field_count:
+            print(f"DBC {name} has {self.field_count} fields, schema {self.schema.name} expects "
+                  f"{self.schema.field_count}. Ignoring schema.")
+            self.schema = None
+
+    @classmethod
+    def open(cls, file_path: str, schema: Optional[DBCSchema] = None, locale: int = 0) -> Optional["DBCTable"]:
+        """Memory-maps a DBC file; returns None if it does not exist."""
+        if not os.path.exists(file_path):
+            print(f"DBC file not found: {file_path}")
+            return None
+        with open(file_path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, os.path.basename(file_path), schema, locale)
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def _resolve(self, field: Union[str, int]):
+        """Returns (column index, schema type or None) for a field name or raw column index."""
+        if isinstance(field, int):
+            return field, None
+        if self.schema is None:
+            raise KeyError(f"{self.name} has no schema; use column indices")
+        spec = self.schema[field]
+        if spec.type == LOCSTRING:
+            return spec.index + self.locale, STRING
+        return spec.index, spec.type
+
+    def column(self, field: Union[str, int], dtype: Optional[str] = None) -> np.ndarray:
+        """
+        Returns one field of every record as a read-only view.
+        dtype is uint32, int32 or float32; by default the schema type (string offsets are uint32).
+        """
+        index, field_type = self._resolve(field)
+        if dtype is None:
+            dtype = field_type if field_type in FIELD_DTYPES else 'uint32'
+        return self.records[:, index].view(FIELD_DTYPES[dtype])
+
+    def get_string(self, offset: int) -> str:
+        """Decodes the string at offset in the string block ("" for invalid offsets), memoized."""
+        cached = self._string_cache.get(offset)
+        if cached is not None:
+            return cached
+        if offset < 0 or offset >= self.string_block_size:
+            return ""
+        start = self._strings_start + offset
+        block_end = self._strings_start + self.string_block_size
+        # Find null terminator
+        end = self._strings.find(b'\x00', start, block_end)
+        text = self._strings[start:end if end != -1 else block_end].decode('utf-8', errors='replace')
+        self._string_cache[offset] = text
+        return text
+
+    def interned_column(self, field: Union[str, int],
+                        rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        A string field of every record (or the given rows) as (uint32 index per record, distinct strings).
+        Each distinct offset is decoded once.
+        """
+        offsets = self.column(field, 'uint32')
+        if rows is not None:
+            offsets = offsets[rows]
+        unique, inverse = np.unique(offsets, return_inverse=True)
+        return inverse.ravel().astype(np.uint32), [self.get_string(offset) for offset in unique.tolist()]
+
+    def string_column(self, field: Union[str, int], rows: Optional[np.ndarray] = None) -> List[str]:
+        """Decodes a string field for every record (or the given rows); each distinct offset is decoded once."""
+        index, strings = self.interned_column(field, rows)
+        return [strings[i] for i in index.tolist()]
+
+    def is_string(self, field: Union[str, int]) -> bool:
+        return isinstance(field, str) and self._resolve(field)[1] == STRING
+
+    # --- Primary key ---
+
+    def keys(self) -> np.ndarray:
+        """The primary key column (schema key, or field 0)."""
+        return self.column(self.schema.key if self.schema else 0, 'uint32')
+
+    def _build_key_index(self):
+        keys = self.keys()
+        if len(keys) and int(keys.max()) < 4 * len(keys) + 1024:
+            # IDs are compact enough for a direct id -> row table: O(1) lookups.
+            dense = np.full(int(keys.max()) + 1, -1, dtype=np.int32)
+            dense[keys[::-1]] = np.arange(len(keys) - 1, -1, -1, dtype=np.int32)
+            self._dense_index = dense
+        else:
+            order = np.argsort(keys, kind='stable')
+            self._sorted_rows = order
+            self._sorted_keys = keys[order]
+
+    def row_index(self, key: int) -> Optional[int]:
+        """Returns the row of the first record with this primary key, or None."""
+        if self._dense_index is None and self._sorted_keys is None:
+            self._build_key_index()
+        if self._dense_index is not None:
+            if 0 <= key < len(self._dense_index):
+                row = int(self._dense_index[key])
+                return row if row >= 0 else None
+            return None
+        pos = int(np.searchsorted(self._sorted_keys, key))
+        if pos < len(self._sorted_keys) and self._sorted_keys[pos] == key:
+            return int(self._sorted_rows[pos])
+        return None
+
+    def __contains__(self, key: int) -> bool:
+        return self.row_index(key) is not None
+
+    def get(self, key: int, fields: Optional[Iterable[Union[str, int]]] = None) -> Optional[dict]:
+        """
+        Returns the record with this primary key as {field: value}, or None.
+        fields defaults to every schema field; only the requested strings are decoded.
+        """
+        row = self.row_index(key)
+        if row is None:
+            return None
+        if fields is None:
+            fields = self.schema.fields if self.schema else range(self.field_count)
+        record = {}
+        for field in fields:
+            value = self.column(field)[row]
+            record[field] = self.get_string(int(value)) if self.is_string(field) else value.item()
+        return record
+
+    def project(self, fields: Iterable[Union[str, int]],
+                rows: Optional[np.ndarray] = None) -> Dict[Union[str, int], Union[np.ndarray, List[str]]]:
+        """
+        Column projection: {field: column} for just these fields (optionally just these rows).
+        Numeric fields are typed views, string fields decoded lists.
+        """
+        result = {}
+        for field in fields:
+            if self.is_string(field):
+                result[field] = self.string_column(field, rows)
+            else:
+                column = self.column(field)
+                result[field] = column if rows is None else column[rows]
+        return result
+
+
+# Spell.dbc fields DataManager keeps; the other ~200 columns are never read.
+SPELL_FIELDS = [
+    "ID", "Name", "NameSubtext", "SpellIconID", "SchoolMask", "Attributes", "SpellLevel",
+    "PowerType", "ManaCost", "CastingTimeIndex", "DurationIndex", "RangeIndex",
+    "Effect_0", "Effect_1", "Effect_2",
+    "EffectAura_0", "EffectAura_1", "EffectAura_2",
+    "EffectBasePoints_0", "EffectBasePoints_1", "EffectBasePoints_2",
+    "EffectMiscValue_0", "EffectMiscValue_1", "EffectMiscValue_2",
+    "EffectTriggerSpell_0", "EffectTriggerSpell_1", "EffectTriggerSpell_2",
+]
+# Suffix of the distinct-string table that goes with an interned string column
+STRINGS_SUFFIX = ".strings"
+
 
 class DBCParser:
     """
     Parser for World of Warcraft (3.3.5a) DBC files.
+    Built on DBCTable and the schemas in dbc_schemas: only the fields each reader needs are touched.
+    New DBCs only need a schema; load_table() opens any of them.
     """
-    
+
     # Generic Header
     Header = Struct(
         "magic" / Const(b"WDBC"),
@@ -15,171 +232,92 @@ class DBCParser:
         "string_block_size" / Int32ul
     )
 
-    def _parse_file(self, file_path):
-        if not os.path.exists(file_path):
-            print(f"DBC file not found: {file_path}")
-            return None, None, None
-
-        with open(file_path, "rb") as f:
-            data = f.read()
-
-        header = self.Header.parse(data)
-        
-        # Calculate offsets
-        header_size = self.Header.sizeof()
-        records_data_size = header.record_count * header.record_size
-        
-        records_raw = data[header_size : header_size + records_data_size]
-        string_block = data[header_size + records_data_size :]
-        
-        return header, records_raw, string_block
-
-    def _get_string(self, offset, string_block):
-        if offset < 0 or offset >= len(string_block):
-            return ""
-        
-        # Find null terminator
-        end = string_block.find(b'\x00', offset)
-        if end == -1:
-            return string_block[offset:].decode('utf-8', errors='replace')
-        return string_block[offset:end].decode('utf-8', errors='replace')
-
-    def read_faction_dbc(self, file_path) -> dict:
+    def load_table(self, source, schema_name: Optional[str] = None, locale: int = 0) -> Optional[DBCTable]:
         """
-        Reads Faction.dbc and returns {id: name}.
-        Assumes Field 0 = ID, Field 23 = Name Offset.
+        Opens a DBC with its schema (by schema_name, or from the file name).
+        source is a file path or the DBC contents (bytes, memoryview or mmap).
+        Returns None if the file is missing, malformed or does not match the schema.
         """
-        header, records_raw, string_block = self._parse_file(file_path)
-        if not header:
-            return {}
-
-        # Define Record Structure dynamically based on expectations
-        # Or just use the generic strategy of parsing integers manually if structure varies?
-        # User constraint: "Map the fields for 3.3.5a Faction.dbc (ID is index 0, Name is index 23 [string ref])."
-        # Since we know record_size and field_count, we can parse strictly.
-        # But wait, 3.3.5a Faction.dbc usually has ~64 fields.
-        # Construct is powerful but defining a struct with 64 Int32ul is tedious if we only need 2.
-        # Better approach: Read as Array of Int32ul (since most DBC fields are 4-byte ints/floats/refs).
-        
-        # Let's verify field_count matches what we expect or just rely on offsets.
-        # Standard DBC is all 4-byte fields usually.
-        
-        # Safe strategy: Array(header.field_count, Int32ul)
-        Record = Array(header.field_count, Int32ul)
-        Records = Array(header.record_count, Record)
-        
+        from_file = isinstance(source, str)
+        schema = get_schema(schema_name or (source if from_file else ""))
+        label = source if from_file else f"{schema_name or 'DBC'} data"
         try:
-            parsed_records = Records.parse(records_raw)
+            if from_file:
+                table = DBCTable.open(source, schema, locale)
+            else:
+                table = DBCTable(source, schema_name or "", schema, locale)
         except Exception as e:
-            print(f"Error parsing records in {file_path}: {e}")
-            return {}
-
-        results = {}
-        for row in parsed_records:
-            if len(row) > 23:
-                f_id = row[0]
-                name_offset = row[23]
-                name = self._get_string(name_offset, string_block)
-                results[f_id] = name
-                
-        return results
+            print(f"Error parsing records in {label}: {e}")
+            return None
+        if table is not None and schema is not None and table.schema is None:
+            return None
+        return table
 
-        return results
+    def read_faction_dbc(self, source) -> dict:
+        """
+        Reads Faction.dbc and returns {id: name}.
+        """
+        table = self.load_table(source, "Faction")
+        if table is None:
+            return {}
+        columns = table.project(["ID", "Name"])
+        return dict(zip(columns["ID"].tolist(), columns["Name"]))
 
-    def read_creature_model_data_dbc(self, file_path) -> dict:
+    def read_creature_model_data_dbc(self, source) -> dict:
         """
         Reads CreatureModelData.dbc.
         Returns {model_id: model_path_string}.
-        ModelID = Field 0.
-        ModelPath = Field 2 (string ref).
         """
-        header, records_raw, string_block = self._parse_file(file_path)
-        if not header:
+        table = self.load_table(source, "CreatureModelData")
+        if table is None:
             return {}
-            
-        Record = Array(header.field_count, Int32ul)
-        Records = Array(header.record_count, Record)
-        
-        try:
-            parsed_records = Records.parse(records_raw)
-        except Exception as e:
-            print(f"Error parsing {file_path}: {e}")
-            return {}
-            
-        results = {}
-        for row in parsed_records:
-            if len(row) > 2:
-                m_id = row[0]
-                path_offset = row[2]
-                path = self._get_string(path_offset, string_block)
-                if path:
-                    results[m_id] = path
-        return results
-
-    def read_display_info_dbc(self, file_path) -> dict:
+        columns = table.project(["ID", "ModelName"])
+        return {m_id: path for m_id, path in zip(columns["ID"].tolist(), columns["ModelName"]) if path}
+
+    def read_display_info_dbc(self, source) -> dict:
         """
         Reads CreatureDisplayInfo.dbc.
         Returns {id: {'model_id': int, 'skin1': str}}.
-        ID = 0, ModelID = 1, Skin1 = 2 (string ref).
+        skin1 is the first texture variation.
         """
-        header, records_raw, string_block = self._parse_file(file_path)
-        if not header:
+        table = self.load_table(source, "CreatureDisplayInfo")
+        if table is None:
             return {}
+        columns = table.project(["ID", "ModelID", "TextureVariation_0"])
+        return {
+            c_id: {'model_id': model_id, 'skin1': skin1}
+            for c_id, model_id, skin1 in zip(columns["ID"].tolist(), columns["ModelID"].tolist(),
+                                              columns["TextureVariation_0"])
+        }
 
-        Record = Array(header.field_count, Int32ul)
-        Records = Array(header.record_count, Record)
-        
-        try:
-            parsed_records = Records.parse(records_raw)
-        except Exception as e:
-            print(f"Error parsing records in {file_path}: {e}")
-            return {}
-
-        results = {}
-        for row in parsed_records:
-            if len(row) > 2:
-                c_id = row[0]
-                model_id = row[1]
-                skin_offset = row[2]
-                skin1 = self._get_string(skin_offset, string_block)
-                
-                results[c_id] = {
-                    'model_id': model_id,
-                    'skin1': skin1
-                }
-                
-        return results
-
-    def read_map_dbc(self, file_path) -> dict:
+    def read_map_dbc(self, source) -> dict:
         """
         Reads Map.dbc and returns {id: name}.
-        Assumes Field 0 = ID, Field 5 = MapName_Lang Offset (enUS).
-        Fallback to Field 1 (Directory) if needed.
+        Uses MapName (enUS), falling back to Directory if needed.
         """
-        header, records_raw, string_block = self._parse_file(file_path)
-        if not header:
+        table = self.load_table(source, "Map")
+        if table is None:
             return {}
+        columns = table.project(["ID", "MapName", "Directory"])
+        return {m_id: name or directory
+                for m_id, name, directory in zip(columns["ID"].tolist(), columns["MapName"], columns["Directory"])}
 
-        Record = Array(header.field_count, Int32ul)
-        Records = Array(header.record_count, Record)
-        
-        try:
-            parsed_records = Records.parse(records_raw)
-        except Exception as e:
-            print(f"Error parsing records in {file_path}: {e}")
+    def read_spell_dbc(self, source, fields: Optional[List[str]] = None) -> dict:
+        """
+        Reads only the given Spell.dbc fields (default SPELL_FIELDS), as columns sorted by ID.
+        Numeric fields are typed arrays; string fields are interned: a uint32 index column plus
+        the distinct strings under "<field>.strings". Returns {} if the file cannot be read.
+        """
+        table = self.load_table(source, "Spell")
+        if table is None:
             return {}
-
-        results = {}
-        for row in parsed_records:
-            if len(row) > 5:
-                m_id = row[0]
-                name_offset = row[5] # MapName_Lang
-                name = self._get_string(name_offset, string_block)
-                if not name and len(row) > 1:
-                    # Fallback to Directory
-                    dir_offset = row[1]
-                    name = self._get_string(dir_offset, string_block)
-                
-                results[m_id] = name
-                
-        return results
+        order = np.argsort(table.keys(), kind='stable')
+        columns = {}
+        for field in fields or SPELL_FIELDS:
+            if table.is_string(field):
+                index, strings = table.interned_column(field, order)
+                columns[field] = index
+                columns[field + STRINGS_SUFFIX] = strings
+            else:
+                columns[field] = np.ascontiguousarray(table.column(field)[order])
+        return columns
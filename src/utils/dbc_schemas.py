@@ -0,0 +1,275 @@
+"""
+Declarative record layouts for 3.3.5a (build 12340) DBC files.
+A schema lists the fields in order as (name, type) or (name, type, count) for arrays;
+arrays expand to name_0 .. name_{count-1}. Adding a DBC is a new SCHEMAS entry.
+"""
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+# Field types (every DBC field is 4 bytes)
+INT32 = 'int32'
+UINT32 = 'uint32'
+FLOAT = 'float32'
+STRING = 'string'        # offset into the string block
+LOCSTRING = 'locstring'  # 16 locale string offsets + a flags field
+
+LOCALE_COUNT = 16
+LOCALES = ["enUS", "koKR", "frFR", "deDE", "zhCN", "zhTW", "esES", "esMX",
+           "ruRU", "jaJP", "ptPT", "itIT", "unk12", "unk13", "unk14", "unk15"]
+
+# index is the first column; width is 17 for localized strings, otherwise 1
+DBCField = namedtuple('DBCField', 'name type index width')
+
+
+class DBCSchema:
+    """Field layout of one DBC: name -> DBCField, total field count and primary key."""
+
+    def __init__(self, name: str, fields: List[Tuple], key: str = "ID"):
+        self.name = name
+        self.key = key
+        self.fields: Dict[str, DBCField] = {}
+        index = 0
+        for spec in fields:
+            field_name, field_type = spec[0], spec[1]
+            count = spec[2] if len(spec) > 2 else 1
+            width = LOCALE_COUNT + 1 if field_type == LOCSTRING else 1
+            names = [field_name] if count == 1 else [f"{field_name}_{i}" for i in range(count)]
+            for expanded in names:
+                self.fields[expanded] = DBCField(expanded, field_type, index, width)
+                index += width
+        self.field_count = index
+
+    def __getitem__(self, field_name: str) -> DBCField:
+        return self.fields[field_name]
+
+    def __contains__(self, field_name: str) -> bool:
+        return field_name in self.fields
+
+    def string_fields(self) -> List[str]:
+        return [f.name for f in self.fields.values() if f.type in (STRING, LOCSTRING)]
+
+
+SCHEMAS: Dict[str, DBCSchema] = {}
+
+
+def register(schema: DBCSchema) -> DBCSchema:
+    SCHEMAS[schema.name.lower()] = schema
+    return schema
+
+
+def get_schema(name: str) -> Optional[DBCSchema]:
+    """Looks up a schema by DBC name or file name ("Map", "Map.dbc", "DBFilesClient\\Map.dbc")."""
+    base = name.replace('/', '\\').rsplit('\\', 1)[-1]
+    if base.lower().endswith('.dbc'):
+        base = base[:-4]
+    return SCHEMAS.get(base.lower())
+
+
+register(DBCSchema("Faction", [
+    ("ID", UINT32),
+    ("ReputationIndex", INT32),
+    ("ReputationRaceMask", UINT32, 4),
+    ("ReputationClassMask", UINT32, 4),
+    ("ReputationBase", INT32, 4),
+    ("ReputationFlags", UINT32, 4),
+    ("ParentFactionID", UINT32),
+    ("ParentFactionMod", FLOAT, 2),
+    ("ParentFactionCap", UINT32, 2),
+    ("Name", LOCSTRING),
+    ("Description", LOCSTRING),
+]))
+
+register(DBCSchema("CreatureModelData", [
+    ("ID", UINT32),
+    ("Flags", UINT32),
+    ("ModelName", STRING),
+    ("SizeClass", INT32),
+    ("ModelScale", FLOAT),
+    ("BloodID", INT32),
+    ("FootprintTextureID", INT32),
+    ("FootprintTextureLength", FLOAT),
+    ("FootprintTextureWidth", FLOAT),
+    ("FootprintParticleScale", FLOAT),
+    ("FoleyMaterialID", INT32),
+    ("FootstepShakeSize", INT32),
+    ("DeathThudShakeSize", INT32),
+    ("SoundID", INT32),
+    ("CollisionWidth", FLOAT),
+    ("CollisionHeight", FLOAT),
+    ("MountHeight", FLOAT),
+    ("GeoBoxMin", FLOAT, 3),
+    ("GeoBoxMax", FLOAT, 3),
+    ("WorldEffectScale", FLOAT),
+    ("AttachedEffectScale", FLOAT),
+    ("MissileCollisionRadius", FLOAT),
+    ("MissileCollisionPush", FLOAT),
+    ("MissileCollisionRaise", FLOAT),
+]))
+
+register(DBCSchema("CreatureDisplayInfo", [
+    ("ID", UINT32),
+    ("ModelID", UINT32),
+    ("SoundID", INT32),
+    ("ExtendedDisplayInfoID", INT32),
+    ("CreatureModelScale", FLOAT),
+    ("CreatureModelAlpha", INT32),
+    ("TextureVariation", STRING, 3),
+    ("PortraitTextureName", STRING),
+    ("BloodLevel", INT32),
+    ("BloodID", INT32),
+    ("NPCSoundID", INT32),
+    ("ParticleColorID", INT32),
+    ("CreatureGeosetData", INT32),
+    ("ObjectEffectPackageID", INT32),
+]))
+
+register(DBCSchema("Map", [
+    ("ID", UINT32),
+    ("Directory", STRING),
+    ("InstanceType", INT32),
+    ("Flags", UINT32),
+    ("PVP", INT32),
+    ("MapName", LOCSTRING),
+    ("AreaTableID", INT32),
+    ("MapDescription0", LOCSTRING),
+    ("MapDescription1", LOCSTRING),
+    ("LoadingScreenID", INT32),
+    ("MinimapIconScale", FLOAT),
+    ("CorpseMapID", INT32),
+    ("Corpse", FLOAT, 2),
+    ("TimeOfDayOverride", INT32),
+    ("ExpansionID", INT32),
+    ("RaidOffset", INT32),
+    ("MaxPlayers", INT32),
+]))
+
+register(DBCSchema("AreaTable", [
+    ("ID", UINT32),
+    ("ContinentID", INT32),
+    ("ParentAreaID", INT32),
+    ("AreaBit", INT32),
+    ("Flags", UINT32),
+    ("SoundProviderPref", INT32),
+    ("SoundProviderPrefUnderwater", INT32),
+    ("AmbienceID", INT32),
+    ("ZoneMusic", INT32),
+    ("IntroSound", INT32),
+    ("ExplorationLevel", INT32),
+    ("AreaName", LOCSTRING),
+    ("FactionGroupMask", UINT32),
+    ("LiquidTypeID", INT32, 4),
+    ("MinElevation", FLOAT),
+    ("AmbientMultiplier", FLOAT),
+    ("LightID", INT32),
+]))
+
+register(DBCSchema("Item", [
+    ("ID", UINT32),
+    ("ClassID", INT32),
+    ("SubclassID", INT32),
+    ("SoundOverrideSubclassID", INT32),
+    ("Material", INT32),
+    ("DisplayInfoID", INT32),
+    ("InventoryType", INT32),
+    ("SheatheType", INT32),
+]))
+
+register(DBCSchema("Spell", [
+    ("ID", UINT32),
+    ("Category", UINT32),
+    ("DispelType", UINT32),
+    ("Mechanic", UINT32),
+    ("Attributes", UINT32),
+    ("AttributesEx", UINT32, 7),
+    ("ShapeshiftMask", UINT32, 2),
+    ("ShapeshiftExclude", UINT32, 2),
+    ("Targets", UINT32),
+    ("TargetCreatureType", UINT32),
+    ("RequiresSpellFocus", UINT32),
+    ("FacingCasterFlags", UINT32),
+    ("CasterAuraState", UINT32),
+    ("TargetAuraState", UINT32),
+    ("ExcludeCasterAuraState", UINT32),
+    ("ExcludeTargetAuraState", UINT32),
+    ("CasterAuraSpell", UINT32),
+    ("TargetAuraSpell", UINT32),
+    ("ExcludeCasterAuraSpell", UINT32),
+    ("ExcludeTargetAuraSpell", UINT32),
+    ("CastingTimeIndex", UINT32),
+    ("RecoveryTime", UINT32),
+    ("CategoryRecoveryTime", UINT32),
+    ("InterruptFlags", UINT32),
+    ("AuraInterruptFlags", UINT32),
+    ("ChannelInterruptFlags", UINT32),
+    ("ProcTypeMask", UINT32),
+    ("ProcChance", UINT32),
+    ("ProcCharges", UINT32),
+    ("MaxLevel", UINT32),
+    ("BaseLevel", UINT32),
+    ("SpellLevel", UINT32),
+    ("DurationIndex", UINT32),
+    ("PowerType", INT32),
+    ("ManaCost", UINT32),
+    ("ManaCostPerLevel", UINT32),
+    ("ManaPerSecond", UINT32),
+    ("ManaPerSecondPerLevel", UINT32),
+    ("RangeIndex", UINT32),
+    ("Speed", FLOAT),
+    ("ModalNextSpell", UINT32),
+    ("CumulativeAura", UINT32),
+    ("Totem", UINT32, 2),
+    ("Reagent", INT32, 8),
+    ("ReagentCount", INT32, 8),
+    ("EquippedItemClass", INT32),
+    ("EquippedItemSubclass", INT32),
+    ("EquippedItemInvTypes", INT32),
+    ("Effect", UINT32, 3),
+    ("EffectDieSides", INT32, 3),
+    ("EffectRealPointsPerLevel", FLOAT, 3),
+    ("EffectBasePoints", INT32, 3),
+    ("EffectMechanic", UINT32, 3),
+    ("ImplicitTargetA", UINT32, 3),
+    ("ImplicitTargetB", UINT32, 3),
+    ("EffectRadiusIndex", UINT32, 3),
+    ("EffectAura", UINT32, 3),
+    ("EffectAuraPeriod", UINT32, 3),
+    ("EffectAmplitude", FLOAT, 3),
+    ("EffectChainTargets", INT32, 3),
+    ("EffectItemType", UINT32, 3),
+    ("EffectMiscValue", INT32, 3),
+    ("EffectMiscValueB", INT32, 3),
+    ("EffectTriggerSpell", UINT32, 3),
+    ("EffectPointsPerCombo", FLOAT, 3),
+    ("EffectSpellClassMask", UINT32, 9),
+    ("SpellVisualID", UINT32, 2),
+    ("SpellIconID", UINT32),
+    ("ActiveIconID", UINT32),
+    ("SpellPriority", UINT32),
+    ("Name", LOCSTRING),
+    ("NameSubtext", LOCSTRING),
+    ("Description", LOCSTRING),
+    ("AuraDescription", LOCSTRING),
+    ("ManaCostPct", UINT32),
+    ("StartRecoveryCategory", UINT32),
+    ("StartRecoveryTime", UINT32),
+    ("MaxTargetLevel", UINT32),
+    ("SpellClassSet", UINT32),
+    ("SpellClassMask", UINT32, 3),
+    ("MaxTargets", UINT32),
+    ("DefenseType", UINT32),
+    ("PreventionType", UINT32),
+    ("StanceBarOrder", UINT32),
+    ("EffectChainAmplitude", FLOAT, 3),
+    ("MinFactionID", UINT32),
+    ("MinReputation", UINT32),
+    ("RequiredAuraVision", UINT32),
+    ("RequiredTotemCategoryID", UINT32, 2),
+    ("RequiredAreasID", INT32),
+    ("SchoolMask", UINT32),
+    ("RuneCostID", UINT32),
+    ("SpellMissileID", UINT32),
+    ("PowerDisplayID", INT32),
+    ("EffectBonusCoefficient", FLOAT, 3),
+    ("DescriptionVariablesID", UINT32),
+    ("Difficulty", UINT32),
+]))
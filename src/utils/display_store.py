@@ -0,0 +1,99 @@
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+
+class DisplayInfoStore(Mapping):
+    """
+    Creature display infos (display id -> model path and texture) as parallel arrays.
+    ids is sorted (uint32); model_index and texture_index (uint32) point into the interned string
+    tables models and textures, so each distinct path is stored once (textures[0] is "").
+    Reads like the {display_id: {'model': path, 'texture': skin}} dict it replaces; rows() and the
+    model()/texture() accessors skip building those dicts.
+    """
+
+    def __init__(self, ids: Optional[np.ndarray] = None, model_index: Optional[np.ndarray] = None,
+                 texture_index: Optional[np.ndarray] = None, models: Optional[List[str]] = None,
+                 textures: Optional[List[str]] = None):
+        self.ids = ids if ids is not None else np.zeros(0, dtype=np.uint32)
+        self.model_index = model_index if model_index is not None else np.zeros(0, dtype=np.uint32)
+        self.texture_index = texture_index if texture_index is not None else np.zeros(0, dtype=np.uint32)
+        self.models = models if models is not None else []
+        self.textures = textures if textures is not None else [""]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, str, str]]) -> "DisplayInfoStore":
+        """Builds a store from (display id, model path, texture) rows, interning the strings."""
+        model_ids: Dict[str, int] = {}
+        texture_ids: Dict[str, int] = {"": 0}
+        ids = []
+        model_index = []
+        texture_index = []
+        for did, model, texture in rows:
+            ids.append(did)
+            model_index.append(model_ids.setdefault(model, len(model_ids)))
+            texture_index.append(texture_ids.setdefault(texture, len(texture_ids)))
+
+        ids = np.array(ids, dtype=np.uint32)
+        order = np.argsort(ids, kind='stable')
+        return cls(ids[order], np.array(model_index, dtype=np.uint32)[order],
+                   np.array(texture_index, dtype=np.uint32)[order], list(model_ids), list(texture_ids))
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "DisplayInfoStore":
+        """Inverse of columns(); the arrays may be read-only views (e.g. on the DBC cache)."""
+        return cls(columns['id'], columns['model_index'], columns['texture_index'],
+                   columns['models'], columns['textures'])
+
+    def columns(self) -> dict:
+        """The store as DBCCache columns."""
+        return {'id': self.ids, 'model_index': self.model_index, 'texture_index': self.texture_index,
+                'models': self.models, 'textures': self.textures}
+
+    def row(self, did) -> Optional[int]:
+        """Position of display id did in the arrays, or None."""
+        if not isinstance(did, (int, np.integer)) or not 0 <= did <= 0xFFFFFFFF:
+            return None
+        pos = int(np.searchsorted(self.ids, did))
+        if pos < len(self.ids) and self.ids[pos] == did:
+            return pos
+        return None
+
+    def model(self, did) -> Optional[str]:
+        pos = self.row(did)
+        return None if pos is None else self.models[self.model_index[pos]]
+
+    def texture(self, did) -> Optional[str]:
+        pos = self.row(did)
+        return None if pos is None else self.textures[self.texture_index[pos]]
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str, str]]:
+        """Yields (display id, model path, texture) in display id order, for rows start..stop."""
+        models = self.models
+        textures = self.textures
+        for did, model, texture in zip(self.ids[start:stop].tolist(), self.model_index[start:stop].tolist(),
+                                       self.texture_index[start:stop].tolist()):
+            yield did, models[model], textures[texture]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the arrays and string tables."""
+        strings = sum(len(text) for text in self.models) + sum(len(text) for text in self.textures)
+        return self.ids.nbytes + self.model_index.nbytes + self.texture_index.nbytes + strings
+
+    # --- Mapping ---
+
+    def __getitem__(self, did) -> dict:
+        pos = self.row(did)
+        if pos is None:
+            raise KeyError(did)
+        return {'model': self.models[self.model_index[pos]], 'texture': self.textures[self.texture_index[pos]]}
+
+    def __contains__(self, did) -> bool:
+        return self.row(did) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.ids)
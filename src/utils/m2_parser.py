@@ -96,19 +96,26 @@ class M2Parser:
 
         return vertices
 
-    def parse_textures(self, m2_bytes: bytes):
+    def parse_textures(self, m2_source):
         """
         Parses texture definitions from M2.
+        Accepts the M2 bytes or a seekable stream (MpqManager.open), in which case
+        only the header and the texture blocks are read.
         Returns the first valid Hardcoded (Type 0) Texture filename found.
         """
-        if not m2_bytes or len(m2_bytes) < 0x60:
+        if not m2_source:
+            return None
+        read = self._range_reader(m2_source)
+
+        header = read(0, 0x60)
+        if len(header) < 0x60:
             return None
             
         # Header Offsets (WotLK)
         # n_textures: uint32 at 0x54
         # ofs_textures: uint32 at 0x58
-        n_textures = struct.unpack('<I', m2_bytes[0x54:0x58])[0]
-        ofs_textures = struct.unpack('<I', m2_bytes[0x58:0x5C])[0]
+        n_textures = struct.unpack('<I', header[0x54:0x58])[0]
+        ofs_textures = struct.unpack('<I', header[0x58:0x5C])[0]
         
         if n_textures == 0 or ofs_textures == 0:
             return None
@@ -117,14 +124,12 @@ class M2Parser:
         stride = 16 # Texture definition block size
         
         for _ in range(n_textures):
-            if current_offset + 16 > len(m2_bytes):
+            tex_def = read(current_offset, 16)
+            if len(tex_def) < 16:
                 break
                 
             # Read Texture Def
-            tex_type = struct.unpack('<I', m2_bytes[current_offset:current_offset+4])[0]
-            tex_flags = struct.unpack('<I', m2_bytes[current_offset+4:current_offset+8])[0]
-            len_filename = struct.unpack('<I', m2_bytes[current_offset+8:current_offset+12])[0]
-            ofs_filename = struct.unpack('<I', m2_bytes[current_offset+12:current_offset+16])[0]
+            tex_type, tex_flags, len_filename, ofs_filename = struct.unpack('<4I', tex_def)
             
             # Type 0 = Hardcoded texture
             if tex_type == 0 and len_filename > 1 and ofs_filename > 0:
@@ -133,6 +138,7 @@ class M2Parser:
                     # Strings in M2 are NOT necessarily null-terminated in the block, 
                     # but 'len_filename' includes null terminator usually? Or just length.
                     # We read len_filename bytes.
+                    raw_name = bytes(read(ofs_filename, len_filename))
                     if raw_name:
                         # Try decoding cleanly, fallback to ascii/replace
                         name = raw_name.decode('utf-8', errors='ignore').split('\x00')[0]
@@ -145,6 +151,16 @@ class M2Parser:
             
         return None
 
+    @staticmethod
+    def _range_reader(m2_source):
+        """Returns read(offset, size) over either a bytes-like object or a seekable stream."""
+        if hasattr(m2_source, 'seek'):
+            def read(offset, size):
+                m2_source.seek(offset)
+                return m2_source.read(size)
+            return read
+        return lambda offset, size: m2_source[offset:offset + size]
+
     def get_internal_texture_list(self, m2_bytes: bytes) -> list:
         """
         Scans the binary for any string ending in .blp.
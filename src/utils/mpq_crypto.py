@@ -0,0 +1,99 @@
+"""
+MPQ crypt table and filename hashing (StormLib algorithm).
+"""
+from typing import Sequence, Tuple
+import numpy as np
+
+# Hash types (offset into the crypt table, in units of 0x100)
+HASH_TABLE_OFFSET = 0
+HASH_A = 1
+HASH_B = 2
+HASH_TABLE_KEY = 3
+
+
+def _prepare_crypt_table() -> list:
+    seed = 0x00100001
+    table = [0] * 0x500
+    for i in range(0x100):
+        index = i
+        for _ in range(5):
+            seed = (seed * 125 + 3) % 0x2AAAAB
+            temp1 = (seed & 0xFFFF) << 0x10
+            seed = (seed * 125 + 3) % 0x2AAAAB
+            temp2 = seed & 0xFFFF
+            table[index] = temp1 | temp2
+            index += 0x100
+    return table
+
+
+CRYPT_TABLE = _prepare_crypt_table()
+
+
+def hash_string(name: str, hash_type: int) -> int:
+    """
+    Hashes an internal path the way the client does.
+    Case-insensitive, and '/' hashes the same as '\\'.
+    """
+    table = CRYPT_TABLE
+    base = hash_type << 8
+    seed1 = 0x7FED7FED
+    seed2 = 0xEEEEEEEE
+    for ch in name.upper().replace('/', '\\').encode('utf-8', errors='replace'):
+        seed1 = (table[base + ch] ^ (seed1 + seed2)) & 0xFFFFFFFF
+        seed2 = (ch + seed1 + seed2 + (seed2 << 5) + 3) & 0xFFFFFFFF
+    return seed1
+
+
+def hash_name_pair(name: str) -> tuple:
+    """Returns the (hash_a, hash_b) pair used to find name in an archive hash table."""
+    return hash_string(name, HASH_A), hash_string(name, HASH_B)
+
+
+def hash_name_pairs(names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Bulk hash_name_pair: returns (hash_a, hash_b) for every name, as uint32 arrays.
+    All names are hashed together one character column at a time
+    (names sorted by length, so each step only touches names that are still running).
+    """
+    count = len(names)
+    if count == 0:
+        return np.zeros(0, np.uint32), np.zeros(0, np.uint32)
+
+    # One upper/replace/encode pass over all names; '\n' separators give the name boundaries.
+    flat = np.frombuffer(('\n'.join(names) + '\n').upper().replace('/', '\\')
+                         .encode('utf-8', errors='replace'), dtype=np.uint8)
+    ends = np.flatnonzero(flat == 0x0A)
+    starts = np.empty(count, dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts
+
+    order = np.argsort(-lengths, kind='stable')
+    starts = starts[order]
+    lengths = lengths[order]
+
+    table = np.array(CRYPT_TABLE, dtype=np.uint32)
+    table_a = table[HASH_A << 8:(HASH_A + 1) << 8]
+    table_b = table[HASH_B << 8:(HASH_B + 1) << 8]
+    a1 = np.full(count, 0x7FED7FED, dtype=np.uint32)
+    a2 = np.full(count, 0xEEEEEEEE, dtype=np.uint32)
+    b1 = a1.copy()
+    b2 = a2.copy()
+
+    # lengths is descending, so the names still running at column j are a prefix.
+    negated = -lengths
+    for j in range(int(lengths[0]) if count else 0):
+        active = int(np.searchsorted(negated, -j, side='left'))
+        ch = flat[starts[:active] + j].astype(np.uint32)
+        s1, s2 = a1[:active], a2[:active]
+        s1[:] = table_a[ch] ^ (s1 + s2)
+        s2[:] = ch + s1 + s2 + (s2 << 5) + 3
+        s1, s2 = b1[:active], b2[:active]
+        s1[:] = table_b[ch] ^ (s1 + s2)
+        s2[:] = ch + s1 + s2 + (s2 << 5) + 3
+
+    hash_a = np.empty(count, dtype=np.uint32)
+    hash_b = np.empty(count, dtype=np.uint32)
+    hash_a[order] = a1
+    hash_b[order] = b1
+    return hash_a, hash_b
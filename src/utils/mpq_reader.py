@@ -0,0 +1,375 @@
+import io
+import os
+import bz2
+import mmap
+import struct
+import threading
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple, Union
+from src.utils.mpq_crypto import CRYPT_TABLE, HASH_TABLE_KEY, hash_string, hash_name_pair
+
+# Block table flags (see StormLib / mpyq)
+MPQ_FILE_IMPLODE = 0x00000100
+MPQ_FILE_COMPRESS = 0x00000200
+MPQ_FILE_ENCRYPTED = 0x00010000
+MPQ_FILE_SINGLE_UNIT = 0x01000000
+MPQ_FILE_SECTOR_CRC = 0x04000000
+MPQ_FILE_EXISTS = 0x80000000
+
+# Sector compression masks
+COMPRESSION_ZLIB = 0x02
+COMPRESSION_BZIP2 = 0x10
+
+# Same field layout as mpyq's MPQBlockTableEntry, so both backends share block entries
+MpqBlock = namedtuple('MpqBlock', 'offset archived_size size flags')
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+_HEADER = struct.Struct('<4sIIHHIIII')
+_HEADER_EXT = struct.Struct('<QHH')
+_HASH_ENTRY_SIZE = 16
+_BLOCK_ENTRY_SIZE = 16
+TABLE_HASH_ROW = struct.Struct('<III')      # hash_a, hash_b, block index
+TABLE_BLOCK_ROW = struct.Struct('<IIII')    # offset, archived size, size, flags
+
+_sector_pool: Optional[ThreadPoolExecutor] = None
+_sector_pool_workers = 0
+_sector_pool_lock = threading.Lock()
+
+
+def _get_sector_pool() -> ThreadPoolExecutor:
+    """Shared pool for parallel sector inflation (zlib and bz2 release the GIL)."""
+    global _sector_pool, _sector_pool_workers
+    with _sector_pool_lock:
+        if _sector_pool is None:
+            _sector_pool_workers = os.cpu_count() or 4
+            _sector_pool = ThreadPoolExecutor(max_workers=_sector_pool_workers,
+                                              thread_name_prefix="mpq-sector")
+        return _sector_pool
+
+
+def decrypt_table(data: BytesLike, key: int) -> List[int]:
+    """Decrypts an MPQ table and returns it as a flat list of uint32 values."""
+    table = CRYPT_TABLE
+    values = struct.unpack(f'<{len(data) // 4}I', data[:len(data) // 4 * 4])
+    seed1 = key
+    seed2 = 0xEEEEEEEE
+    result = [0] * len(values)
+    for i, value in enumerate(values):
+        seed2 = (seed2 + table[0x400 + (seed1 & 0xFF)]) & 0xFFFFFFFF
+        value = (value ^ (seed1 + seed2)) & 0xFFFFFFFF
+        seed1 = (((~seed1 << 0x15) + 0x11111111) | (seed1 >> 0x0B)) & 0xFFFFFFFF
+        seed2 = (value + seed2 + (seed2 << 5) + 3) & 0xFFFFFFFF
+        result[i] = value
+    return result
+
+
+def pack_tables(hash_lookup: Dict[Tuple[int, int], int], block_table: list) -> Tuple[bytes, bytes]:
+    """Serializes parsed archive tables (live hash entries only) as (hash rows, block rows)."""
+    hash_rows = b''.join(TABLE_HASH_ROW.pack(a, b, index) for (a, b), index in hash_lookup.items())
+    block_rows = b''.join(TABLE_BLOCK_ROW.pack(*block) for block in block_table)
+    return hash_rows, block_rows
+
+
+def unpack_tables(hash_rows: BytesLike, block_rows: BytesLike) -> Tuple[Dict[Tuple[int, int], int], List[MpqBlock]]:
+    """Inverse of pack_tables: returns (hash_lookup, block_table) without decrypting anything."""
+    hash_lookup = {(a, b): index for a, b, index in TABLE_HASH_ROW.iter_unpack(hash_rows)}
+    block_table = list(map(MpqBlock._make, TABLE_BLOCK_ROW.iter_unpack(block_rows)))
+    return hash_lookup, block_table
+
+
+def decompress(data: BytesLike) -> bytes:
+    """Decompresses one sector (or single-unit file) according to its leading compression mask."""
+    compression_type = data[0]
+    if compression_type == COMPRESSION_ZLIB:
+        return zlib.decompress(data[1:], 15)
+    elif compression_type == COMPRESSION_BZIP2:
+        return bz2.decompress(data[1:])
+    elif compression_type == 0:
+        return bytes(data[1:])
+    raise RuntimeError(f"Unsupported compression type: {compression_type}")
+
+
+class MpqReader:
+    """
+    Memory-mapped MPQ archive reader (format v0/v1, as shipped with 3.3.5a).
+    Parses the hash and block tables itself and serves stored files as zero-copy
+    memoryviews into the mapping. Compressed sector files are inflated into a
+    single preallocated buffer.
+
+    Interface matches MpqArchiveHandle: path, name, offset, sector_size, files,
+    find_block() and read_block().
+    """
+
+    # Sector files at least this large are inflated in parallel; smaller ones stay serial.
+    parallel_threshold = 256 * 1024
+
+    def __init__(self, path: str, header_offset: Optional[int] = None, sector_size: Optional[int] = None,
+                 tables: Optional[Tuple[bytes, bytes]] = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.hash_lookup: Optional[Dict[Tuple[int, int], int]] = None
+        self.block_table: List[MpqBlock] = []
+        self.files: List[str] = []
+        self._tables_lock = threading.Lock()
+        self._packed_tables = tables
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        if header_offset is None:
+            self._load_tables()
+            self._read_listfile()
+        else:
+            # Index cache hit: tables are restored (or parsed) lazily on the first hash lookup,
+            # and the listfile is never read.
+            self.offset = header_offset
+            self.sector_size = sector_size
+
+    def _find_header(self) -> int:
+        """Returns the archive header offset (handles user data headers and 512-byte aligned headers)."""
+        magic = bytes(self._view[0:4])
+        if magic == b'MPQ\x1b':
+            return struct.unpack_from('<I', self._view, 8)[0]
+        pos = 0
+        size = len(self._view)
+        while pos + _HEADER.size <= size:
+            if self._view[pos:pos + 4] == b'MPQ\x1a':
+                return pos
+            pos += 0x200
+        raise ValueError(f"No MPQ header found in {self.name}")
+
+    def _load_tables(self):
+        self.offset = self._find_header()
+        (magic, header_size, archive_size, format_version, sector_size_shift,
+         hash_table_offset, block_table_offset, hash_table_entries,
+         block_table_entries) = _HEADER.unpack_from(self._view, self.offset)
+        if magic != b'MPQ\x1a':
+            raise ValueError(f"Invalid MPQ header in {self.name}")
+        self.sector_size = 512 << sector_size_shift
+
+        if format_version >= 1:
+            _, hash_offset_high, block_offset_high = _HEADER_EXT.unpack_from(self._view, self.offset + _HEADER.size)
+            hash_table_offset |= hash_offset_high << 32
+            block_table_offset |= block_offset_high << 32
+
+        hash_start = self.offset + hash_table_offset
+        hash_values = decrypt_table(self._view[hash_start:hash_start + hash_table_entries * _HASH_ENTRY_SIZE],
+                                    hash_string('(hash table)', HASH_TABLE_KEY))
+        block_start = self.offset + block_table_offset
+        block_values = decrypt_table(self._view[block_start:block_start + block_table_entries * _BLOCK_ENTRY_SIZE],
+                                     hash_string('(block table)', HASH_TABLE_KEY))
+
+        self.block_table = [MpqBlock(*block_values[i:i + 4]) for i in range(0, len(block_values), 4)]
+
+        block_count = len(self.block_table)
+        hash_lookup = {}
+        for i in range(0, len(hash_values), 4):
+            hash_a, hash_b, _, block_index = hash_values[i:i + 4]
+            if block_index < block_count:
+                hash_lookup.setdefault((hash_a, hash_b), block_index)
+        self.hash_lookup = hash_lookup
+
+    def _read_listfile(self):
+        self.files = []
+        block = self.find_block('(listfile)')
+        listfile = self.read_block(block) if block is not None else None
+        if listfile:
+            for line in bytes(listfile).replace(b';', b'\n').splitlines():
+                try:
+                    name = line.decode('utf-8').strip()
+                except UnicodeDecodeError:
+                    continue
+                if name:
+                    self.files.append(name)
+
+    def tables(self) -> Tuple[Dict[Tuple[int, int], int], list]:
+        """Returns (hash_lookup, block_table), parsing the archive tables on first use."""
+        if self.hash_lookup is None:
+            with self._tables_lock:
+                if self.hash_lookup is None:
+                    if self._packed_tables is not None:
+                        # Index cache hit: the decrypted tables were saved with the index.
+                        hash_lookup, self.block_table = unpack_tables(*self._packed_tables)
+                        self._packed_tables = None
+                        self.hash_lookup = hash_lookup
+                    else:
+                        self._load_tables()
+        return self.hash_lookup, self.block_table
+
+    def find_block(self, filename: str) -> Optional[MpqBlock]:
+        """Returns the block table entry for filename, or None if the archive does not contain it."""
+        hash_lookup, block_table = self.tables()
+        index = hash_lookup.get(hash_name_pair(filename))
+        if index is None:
+            return None
+        block = block_table[index]
+        if not block.flags & MPQ_FILE_EXISTS:
+            return None
+        return block
+
+    def read_block(self, block) -> Optional[BytesLike]:
+        """
+        Reads a block table entry.
+        Stored files come back as a memoryview into the mapping (no copy);
+        compressed files as a memoryview over one freshly inflated buffer.
+        """
+        if block.archived_size == 0:
+            return None
+        if block.flags & MPQ_FILE_ENCRYPTED:
+            print(f"Encrypted files are not supported ({self.name}).")
+            return None
+        if block.flags & MPQ_FILE_IMPLODE:
+            print(f"PKWARE imploded files are not supported ({self.name}).")
+            return None
+
+        start = self.offset + block.offset
+        raw = self._view[start:start + block.archived_size]
+
+        if not block.flags & MPQ_FILE_COMPRESS:
+            # Stored data is contiguous even for sector files (no sector offset table).
+            return raw[:block.size]
+
+        if block.flags & MPQ_FILE_SINGLE_UNIT:
+            # Compression only happens when at least one byte is gained.
+            if block.size > block.archived_size:
+                return memoryview(decompress(raw))
+            return raw
+
+        return memoryview(self._inflate_sectors(block, raw))
+
+    def read_raw(self, block, start: int, size: int) -> BytesLike:
+        """Returns size bytes of the block's archived (still compressed) data from start, without copying."""
+        start += self.offset + block.offset
+        return self._view[start:start + size]
+
+    def sector_positions(self, block, raw: BytesLike) -> Tuple[int, ...]:
+        """Returns the sector offset table of a compressed sector file (n_sectors + 1 entries)."""
+        sectors = (block.size + self.sector_size - 1) // self.sector_size
+        return struct.unpack_from(f'<{sectors + 1}I', raw, 0)
+
+    def _inflate_sectors(self, block, raw: BytesLike) -> bytearray:
+        positions = self.sector_positions(block, raw)
+        out = bytearray(block.size)
+        sector_size = self.sector_size
+        sector_count = len(positions) - 1
+
+        def inflate(first: int, last: int):
+            for i in range(first, last):
+                out_pos = i * sector_size
+                expected = min(sector_size, block.size - out_pos)
+                sector = raw[positions[i]:positions[i + 1]]
+                # Sectors that did not shrink are stored as-is.
+                if len(sector) < expected:
+                    sector = decompress(sector)
+                out[out_pos:out_pos + len(sector)] = sector
+
+        if block.size < self.parallel_threshold or sector_count < 2:
+            inflate(0, sector_count)
+            return out
+
+        # One contiguous run of sectors per worker keeps task overhead below the inflate cost.
+        pool = _get_sector_pool()
+        chunk = -(-sector_count // _sector_pool_workers)
+        futures = [pool.submit(inflate, first, min(first + chunk, sector_count))
+                   for first in range(0, sector_count, chunk)]
+        for future in futures:
+            future.result()
+        return out
+
+
+class MpqFileStream(io.RawIOBase):
+    """
+    Read-only, seekable stream over one file of an archive (either backend).
+    Compressed sectors are read and inflated on demand, so reading a header
+    only touches the first sector. Single unit compressed files are inflated
+    whole on first read; stored files are sliced straight from the archive.
+    """
+
+    def __init__(self, archive, block):
+        super().__init__()
+        self._archive = archive
+        self._block = block
+        self._size = block.size
+        self._pos = 0
+        self._sector_size = archive.sector_size
+        self._data: Optional[BytesLike] = None
+        self._positions: Optional[Tuple[int, ...]] = None
+        self._cached_index = -1
+        self._cached_sector: BytesLike = b''
+
+        if block.flags & MPQ_FILE_COMPRESS and not block.flags & MPQ_FILE_SINGLE_UNIT:
+            sectors = (block.size + self._sector_size - 1) // self._sector_size
+            table = archive.read_raw(block, 0, 4 * (sectors + 1))
+            self._positions = struct.unpack(f'<{sectors + 1}I', table)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._size - self._pos)
+        if size <= 0:
+            return 0
+        chunk = self._read_range(self._pos, size)
+        buffer[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def _read_range(self, start: int, size: int) -> BytesLike:
+        block = self._block
+        if not block.flags & MPQ_FILE_COMPRESS:
+            return self._archive.read_raw(block, start, size)
+
+        if self._positions is None:
+            if self._data is None:
+                raw = self._archive.read_raw(block, 0, block.archived_size)
+                # Compression only happens when at least one byte is gained.
+                self._data = decompress(raw) if block.size > block.archived_size else raw
+            return self._data[start:start + size]
+
+        out = bytearray()
+        end = start + size
+        index = start // self._sector_size
+        while start < end:
+            sector = self._sector(index)
+            sector_start = index * self._sector_size
+            piece = sector[start - sector_start:end - sector_start]
+            if not piece:
+                break
+            out += piece
+            start += len(piece)
+            index += 1
+        return out
+
+    def _sector(self, index: int) -> BytesLike:
+        if index != self._cached_index:
+            positions = self._positions
+            raw = self._archive.read_raw(self._block, positions[index], positions[index + 1] - positions[index])
+            expected = min(self._sector_size, self._size - index * self._sector_size)
+            # Sectors that did not shrink are stored as-is.
+            self._cached_sector = decompress(raw) if len(raw) < expected else raw
+            self._cached_index = index
+        return self._cached_sector
@@ -0,0 +1,472 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from typing import Callable, Container, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from src.utils.display_store import DisplayInfoStore
+
+
+def trigrams(text: str) -> set:
+    """Returns the distinct 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Substring index over a fixed sequence of (already normalized) keys,
+    e.g. a list or a FrontCodedTable.
+    Each trigram maps to a sorted array of key ids, so a query only touches
+    the ids that share every trigram of the query before verifying with 'in'.
+    Ranking is left to the caller.
+    """
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = keys
+        postings: Dict[str, array] = defaultdict(lambda: array('I'))
+        for key_id, key in enumerate(keys):
+            for gram in trigrams(key):
+                postings[gram].append(key_id)
+        self.postings = dict(postings)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def candidates(self, query: str) -> Optional[Iterable[int]]:
+        """
+        Returns ids whose keys contain every trigram of query (a superset of the matches),
+        or None if the query is too short to filter on.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return None
+
+        lists = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return ()
+            lists.append(posting)
+        lists.sort(key=len)
+
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    def search(self, query: str) -> List[int]:
+        """Returns the ids of all keys containing query as a substring (in id order)."""
+        return list(self.iter_search(query))
+
+    def iter_search(self, query: str) -> Iterator[int]:
+        """Yields the ids of the keys containing query in id order, verifying lazily (callers may stop early)."""
+        keys = self.keys
+        candidates = self.candidates(query)
+        if candidates is None:
+            return (key_id for key_id, key in enumerate(keys) if query in key)
+        return (key_id for key_id in sorted(candidates) if query in keys[key_id])
+
+    def similar(self, query: str, min_shared: int, limit: int,
+                eligible: Optional[np.ndarray] = None) -> List[int]:
+        """
+        Fuzzy candidates: ids of up to limit keys sharing at least min_shared (at least 1) distinct trigrams
+        with query, most shared first. eligible optionally masks the keys worth considering.
+        An edit breaks at most the 4 trigrams around it (3, unless it swaps two characters), so keys within
+        k edits of a query with n trigrams share at least n - 4k of them; callers verify the candidates.
+        """
+        min_shared = max(1, min_shared)
+        lists = [self.postings[gram] for gram in trigrams(query) if gram in self.postings]
+        if len(lists) < min_shared:
+            return []
+        counts = np.bincount(np.concatenate([np.frombuffer(posting, dtype=np.uint32) for posting in lists]),
+                             minlength=len(self.keys))
+        if eligible is not None:
+            counts[~eligible] = 0
+        hits = np.flatnonzero(counts >= min_shared)
+        if len(hits) > limit:
+            hits = hits[np.argpartition(-counts[hits], limit - 1)[:limit]]
+        return hits[np.argsort(-counts[hits], kind='stable')].tolist()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance between a and b counting insertions, deletions, substitutions and swaps of adjacent
+    characters (optimal string alignment); any distance above limit is returned as limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(row[j] + 1, current[j - 1] + 1, row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous, row = row, current
+    return min(row[-1], limit + 1)
+
+
+def typo_limit(word: str) -> int:
+    """Edits a query word may be away from what it matches: none below 4 characters, 2 from 8."""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+class PathSearchIndex:
+    """
+    Substring search over normalized ('\\'-separated, lowercase) paths, ranked by match class:
+    exact file name, file name prefix, other file name substring, directory substring.
+    Paths are numbered shortest first, which orders each class; the classes are produced in turn
+    and the search stops at limit, so its cost follows limit rather than the number of matches.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.keys = sorted(paths, key=lambda key: (len(key), key))
+        self.trigrams = TrigramIndex(self.keys)
+        # Key ids ordered by file name (then id), for exact and prefix file name lookups
+        self.by_name = array('I', sorted(range(len(self.keys)), key=lambda key_id: (self._name(key_id), key_id)))
+
+    def _name(self, key_id: int) -> str:
+        key = self.keys[key_id]
+        return key[key.rfind('\\') + 1:]
+
+    def _bisect_name(self, text: str, lo: int, hi: int) -> int:
+        """First position in by_name[lo:hi] whose file name is >= text."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name(self.by_name[mid]) < text:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Returns up to limit ids of keys containing query, best first."""
+        if not query or limit <= 0:
+            return []
+        results = []
+        seen = set()
+
+        def add(key_ids) -> bool:
+            for key_id in key_ids:
+                if key_id not in seen:
+                    seen.add(key_id)
+                    results.append(key_id)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        if '\\' not in query:
+            start = self._bisect_name(query, 0, len(self.by_name))
+            exact_stop = self._bisect_name(query + '\0', start, len(self.by_name))
+            # query + U+FFFF sorts after every file name starting with query
+            stop = self._bisect_name(query + '\uffff', exact_stop, len(self.by_name))
+            if add(self.by_name[start:exact_stop]) or add(sorted(self.by_name[exact_stop:stop])):
+                return results
+
+        # Substring matches: file name hits in key (length) order, directory hits after them.
+        # A query spanning a separator only matches directories, already in order.
+        directory_hits = []
+        for key_id in self.trigrams.iter_search(query):
+            if key_id in seen:
+                continue
+            key = self.keys[key_id]
+            if '\\' in query or key.find(query, key.rfind('\\') + 1) != -1:
+                if add((key_id,)):
+                    return results
+            elif len(directory_hits) < limit:
+                directory_hits.append(key_id)
+        add(directory_hits)
+        return results
+
+
+def path_tokens(path: str) -> List[str]:
+    """Directory names and the file stem of a normalized ('\\'-separated, lowercase) path."""
+    parts = [part for part in path.split('\\') if part]
+    if parts:
+        parts[-1] = parts[-1].rsplit('.', 1)[0]
+    return parts
+
+
+def word_tokens(text: str) -> List[str]:
+    """Words of a (lowercase) name, e.g. "shadow bolt" -> ["shadow", "bolt"]."""
+    return [word for word in re.split(r"[^\w']+", text) if word]
+
+
+def group_by_string(ids: np.ndarray, index: np.ndarray, strings: Sequence[str],
+                    groups: Optional[Dict[str, List[np.ndarray]]] = None) -> Dict[str, List[np.ndarray]]:
+    """
+    Groups ids (sorted) by the interned string each row points to: lowercase string -> [id arrays].
+    Empty strings are skipped. Pass groups to merge several string columns into one index.
+    """
+    if groups is None:
+        groups = defaultdict(list)
+    if not len(index):
+        return groups
+    order = np.argsort(index, kind='stable')
+    grouped = index[order]
+    bounds = np.flatnonzero(grouped[1:] != grouped[:-1]) + 1
+    starts = [0] + bounds.tolist()
+    for start, group in zip(starts, np.split(ids[order], bounds)):
+        text = strings[grouped[start]]
+        if text:
+            groups[text.replace('/', '\\').lower()].append(group)
+    return groups
+
+
+class KeyedSearchIndex:
+    """
+    Search index over records that share a limited set of strings (model paths, names...).
+    The distinct strings are the index keys, each with the sorted ids of the records using it.
+    Keys are numbered shortest first, which makes key id order the tie-break of every ranking class:
+    exact record id, exact token, token prefix, last path segment substring, other substring,
+    fuzzy match. Tokens come from tokenize(key); substring matching (3+ characters) goes through a
+    TrigramIndex over the keys. Fuzzy matching finds keys with a token close to every query word
+    (typo_limit edits, words in any order) through a TrigramIndex over the padded tokens.
+    Each class is produced in order and the search stops once limit records are found,
+    so broad queries cost about as much as narrow ones.
+    """
+    # Scores of the ranking classes (lower is better); ranked() returns them so that
+    # results of several indexes can be merged (SearchService).
+    SCORE_ID, SCORE_TOKEN, SCORE_PREFIX, SCORE_NAME, SCORE_SUBSTRING, SCORE_FUZZY = range(6)
+    # Tokens verified by edit distance per query word (those sharing the most trigrams with it)
+    FUZZY_CANDIDATES = 256
+
+    def __init__(self, key_groups: Dict[str, List[np.ndarray]], records: Container,
+                 tokenize: Callable[[str], List[str]]):
+        self.records = records
+        self.tokenize = tokenize
+        self.keys = sorted(key_groups, key=lambda key: (len(key), key))
+        self.key_records = []
+        for key in self.keys:
+            groups = key_groups[key]
+            ids = groups[0] if len(groups) == 1 else np.unique(np.concatenate(groups))
+            self.key_records.append(array('I', ids.tolist()))
+        self.trigrams = TrigramIndex(self.keys)
+
+        # Sorted distinct tokens, each with the sorted ids of the keys containing it
+        postings: Dict[str, array] = defaultdict(lambda: array('I'))
+        for key_id, key in enumerate(self.keys):
+            for token in dict.fromkeys(tokenize(key)):
+                postings[token].append(key_id)
+        self.tokens = sorted(postings)
+        self.token_keys = [postings[token] for token in self.tokens]
+        # Padding gives short tokens enough trigrams to tell typos apart
+        self.token_trigrams = TrigramIndex([f" {token} " for token in self.tokens])
+        self.token_lengths = np.fromiter(map(len, self.tokens), dtype=np.int32, count=len(self.tokens))
+
+    def _word_matches(self, word: str, prefix: bool) -> Dict[int, int]:
+        """
+        Token ids matching one query word -> edits: 0 for the word itself (and, with prefix,
+        tokens starting with it), otherwise the edit distance, up to typo_limit(word).
+        """
+        tokens = self.tokens
+        start = bisect_left(tokens, word)
+        stop = bisect_left(tokens, word + '\uffff', start) if prefix else start + 1
+        matches = {token_id: 0 for token_id in range(start, min(stop, len(tokens))) if tokens[token_id].startswith(word)}
+        limit = typo_limit(word)
+        if limit:
+            padded = f" {word} "
+            eligible = np.abs(self.token_lengths - len(word)) <= limit
+            for token_id in self.token_trigrams.similar(padded, len(padded) - 2 - 4 * limit,
+                                                        self.FUZZY_CANDIDATES, eligible):
+                if token_id not in matches:
+                    edits = edit_distance(word, tokens[token_id], limit)
+                    if edits <= limit:
+                        matches[token_id] = edits
+        return matches
+
+    def _fuzzy_matches(self, query: str) -> List[Tuple[int, int]]:
+        """
+        (key id, edits) of the keys with a matching token for every word of query (the last word
+        may be a prefix), fewest edits first, then shortest.
+        """
+        words = [word for part in query.split() for word in self.tokenize(part)]
+        costs: Optional[Dict[int, int]] = None
+        for position, word in enumerate(words):
+            word_costs: Dict[int, int] = {}
+            for token_id, edits in self._word_matches(word, position == len(words) - 1).items():
+                for key_id in self.token_keys[token_id]:
+                    if costs is None or key_id in costs:
+                        if edits < word_costs.get(key_id, edits + 1):
+                            word_costs[key_id] = edits
+            if costs is None:
+                costs = word_costs
+            else:
+                costs = {key_id: costs[key_id] + edits for key_id, edits in word_costs.items()}
+            if not costs:
+                return []
+        return sorted((costs or {}).items(), key=lambda item: (item[1], item[0]))
+
+    def _token_matches(self, query: str) -> Iterable[Tuple[int, int]]:
+        """
+        (key id, score) of the keys with a token equal to query (SCORE_TOKEN), then of those with
+        a token starting with it (SCORE_PREFIX), shortest first.
+        """
+        start = bisect_left(self.tokens, query)
+        # query + U+FFFF sorts after every token starting with query
+        stop = bisect_left(self.tokens, query + '\uffff', start)
+        if start == stop:
+            return
+        if self.tokens[start] == query:
+            for key_id in self.token_keys[start]:
+                yield key_id, self.SCORE_TOKEN
+            start += 1
+        if stop - start == 1:
+            prefixed = self.token_keys[start]
+        elif start < stop:
+            # Usually many tokens with a key or two each: one sort beats a k-way merge.
+            prefixed = array('I')
+            for keys in self.token_keys[start:stop]:
+                prefixed.extend(keys)
+            prefixed = sorted(set(prefixed))
+        else:
+            return
+        for key_id in prefixed:
+            yield key_id, self.SCORE_PREFIX
+
+    def search(self, query: str, limit: int = 100) -> List[int]:
+        """Returns up to limit record ids matching query, best first."""
+        return [rid for rid, _ in self.ranked(query, limit)]
+
+    def ranked(self, query: str, limit: int = 100) -> List[Tuple[int, float]]:
+        """
+        Returns up to limit (record id, score) matching query, best first.
+        Scores are the SCORE_* class of the match; fuzzy matches add 1 - trigram coverage.
+        """
+        query = query.strip().replace('/', '\\').lower()
+        if not query or limit <= 0:
+            return []
+
+        results = []
+        seen = set()
+
+        def add(rids, score) -> bool:
+            for rid in rids:
+                if rid not in seen:
+                    seen.add(rid)
+                    results.append((rid, score))
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        if query.isdigit() and int(query) in self.records:
+            add((int(query),), self.SCORE_ID)
+
+        matched_keys = set()
+        for key_id, score in self._token_matches(query):
+            if key_id in matched_keys:
+                continue
+            matched_keys.add(key_id)
+            if add(self.key_records[key_id], score):
+                return results
+
+        if len(query) < 3:
+            return results
+
+        # Substring matches: file name hits in key (length) order, other hits after them
+        other_keys = []
+        for key_id in self.trigrams.search(query):
+            if key_id in matched_keys:
+                continue
+            matched_keys.add(key_id)
+            key = self.keys[key_id]
+            if key.find(query, key.rfind('\\') + 1) != -1:
+                if add(self.key_records[key_id], self.SCORE_NAME):
+                    return results
+            elif len(other_keys) < limit:
+                other_keys.append(key_id)
+        for key_id in other_keys:
+            if add(self.key_records[key_id], self.SCORE_SUBSTRING):
+                return results
+
+        # Fuzzy matches fill whatever is left, closest first
+        for key_id, edits in self._fuzzy_matches(query):
+            if key_id in matched_keys:
+                continue
+            if add(self.key_records[key_id], self.SCORE_FUZZY + edits / (len(query) + 1)):
+                break
+        return results
+
+
+class ModelSearchIndex(KeyedSearchIndex):
+    """
+    Model search over a DisplayInfoStore: keys are model paths and texture names,
+    tokens are path directories and file stems.
+    """
+
+    def __init__(self, display_infos: DisplayInfoStore):
+        groups = group_by_string(display_infos.ids, display_infos.model_index, display_infos.models)
+        group_by_string(display_infos.ids, display_infos.texture_index, display_infos.textures, groups)
+        super().__init__(groups, display_infos, path_tokens)
+        self.display_infos = display_infos
+
+
+class NameSearchIndex(KeyedSearchIndex):
+    """Name search over an interned string column (e.g. spell names); tokens are words."""
+
+    def __init__(self, ids: np.ndarray, index: np.ndarray, strings: Sequence[str], records: Container):
+        super().__init__(group_by_string(ids, index, strings), records, word_tokens)
+
+    @classmethod
+    def from_mapping(cls, names: Mapping[int, str]) -> "NameSearchIndex":
+        """Index over an {id: name} table (factions, maps...)."""
+        strings: Dict[str, int] = {}
+        index = np.fromiter((strings.setdefault(name, len(strings)) for name in names.values()),
+                            dtype=np.uint32, count=len(names))
+        ids = np.fromiter(names.keys(), dtype=np.uint32, count=len(names))
+        return cls(ids, index, list(strings), names)
+
+
+# One result of SearchService.search(): table name, record id, display label, score (lower is better)
+SearchHit = namedtuple('SearchHit', 'table id label score')
+
+
+class SearchService:
+    """
+    One search over several tables, each a KeyedSearchIndex plus a label(id) function.
+    Tables are added (or replaced) one by one as they load; searches always see a consistent set,
+    since the table map is replaced rather than modified. Results of all tables are merged by score
+    (exact id, exact word, prefix, substring, fuzzy), then by table registration order and per-table rank.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Tuple[KeyedSearchIndex, Callable[[int], str]]] = {}
+
+    def add(self, table: str, index: KeyedSearchIndex, label: Callable[[int], str]):
+        """Makes table searchable (replacing its previous index)."""
+        tables = dict(self._tables)
+        tables[table] = (index, label)
+        self._tables = tables
+
+    @property
+    def tables(self) -> List[str]:
+        """Names of the searchable tables, in registration order."""
+        return list(self._tables)
+
+    def search(self, query: str, tables: Optional[Iterable[str]] = None, limit: int = 20) -> List[SearchHit]:
+        """
+        Returns the limit best matches of query across tables (all by default), best first.
+        Unknown or not yet loaded tables are skipped.
+        """
+        registered = self._tables
+        wanted = None if tables is None else set(tables)
+        names = [name for name in registered if wanted is None or name in wanted]
+        candidates = []
+        for order, name in enumerate(names):
+            index, _ = registered[name]
+            for rank, (rid, score) in enumerate(index.ranked(query, limit)):
+                candidates.append((score, order, rank, name, rid))
+
+        hits = []
+        for score, _, _, name, rid in heapq.nsmallest(limit, candidates):
+            hits.append(SearchHit(name, rid, registered[name][1](rid), score))
+        return hits
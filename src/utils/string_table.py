@@ -0,0 +1,154 @@
+import struct
+from array import array
+from bisect import bisect_right
+from os.path import commonprefix
+from typing import Iterable, Iterator, List, Tuple
+
+# Per string: shared prefix length with the previous string, suffix length.
+# Both fit a byte for almost every path; _LONG_MARK in the first byte escapes to the wide form.
+_SHORT_HEADER = struct.Struct('<BB')
+_LONG_HEADER = struct.Struct('<BII')
+_LONG_MARK = 0xFF
+
+
+class FrontCodedTable:
+    """
+    Sorted, deduplicated strings stored front-coded in a single bytes buffer.
+    Strings are grouped into buckets of BUCKET_SIZE; the first string of a bucket is stored whole,
+    the others as (shared prefix length, suffix) against their predecessor. Only the bucket
+    offsets are kept as an index, so a path table costs roughly its unique suffix bytes.
+    Supports random access, binary search and prefix (directory) ranges.
+    """
+    BUCKET_SIZE = 16
+
+    def __init__(self, strings: Iterable[str]):
+        buffer = bytearray()
+        offsets = array('I')
+        count = 0
+        prev = b''
+        for text in sorted(set(strings)):
+            data = text.encode('utf-8')
+            if count % self.BUCKET_SIZE == 0:
+                offsets.append(len(buffer))
+                shared = 0
+            else:
+                shared = len(commonprefix((prev, data)))
+            suffix_len = len(data) - shared
+            if shared < _LONG_MARK and suffix_len <= 0xFF:
+                buffer += _SHORT_HEADER.pack(shared, suffix_len)
+            else:
+                buffer += _LONG_HEADER.pack(_LONG_MARK, shared, suffix_len)
+            buffer += data[shared:]
+            prev = data
+            count += 1
+
+        self.buffer = bytes(buffer)
+        self.offsets = offsets
+        self.count = count
+        self._heads = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate resident size of the table data."""
+        return len(self.buffer) + self.offsets.itemsize * len(self.offsets)
+
+    def _decode_bucket(self, bucket: int, stop: int) -> Iterator[bytes]:
+        """Yields the first stop strings of a bucket as bytes."""
+        buffer = self.buffer
+        pos = self.offsets[bucket]
+        current = b''
+        for _ in range(stop):
+            shared = buffer[pos]
+            if shared == _LONG_MARK:
+                _, shared, suffix_len = _LONG_HEADER.unpack_from(buffer, pos)
+                pos += _LONG_HEADER.size
+            else:
+                suffix_len = buffer[pos + 1]
+                pos += _SHORT_HEADER.size
+            current = current[:shared] + buffer[pos:pos + suffix_len]
+            pos += suffix_len
+            yield current
+
+    def _get_bytes(self, index: int) -> bytes:
+        bucket, pos = divmod(index, self.BUCKET_SIZE)
+        for current in self._decode_bucket(bucket, pos + 1):
+            pass
+        return current
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("FrontCodedTable index out of range")
+        return self._get_bytes(index).decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_range(0, self.count)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[str]:
+        """Yields strings[start:stop] in order, decoding each bucket once."""
+        index = start
+        while index < stop:
+            bucket, pos = divmod(index, self.BUCKET_SIZE)
+            end = min(self.BUCKET_SIZE, pos + stop - index)
+            for i, current in enumerate(self._decode_bucket(bucket, end)):
+                if i >= pos:
+                    yield current.decode('utf-8')
+            index += end - pos
+
+    def _bisect(self, key: bytes, lo: int = 0, hi: int = None) -> int:
+        """Returns the first index in [lo, hi) whose string is >= key (bytes order equals str order)."""
+        if hi is None:
+            hi = self.count
+        if self.count == 0:
+            return 0
+        if self._heads is None:
+            self._heads = [next(self._decode_bucket(b, 1)) for b in range(len(self.offsets))]
+
+        # Last bucket whose head is < key holds the insertion point (or it is the next bucket head).
+        bucket = max(bisect_right(self._heads, key) - 1, 0)
+        index = bucket * self.BUCKET_SIZE
+        stop = min(self.BUCKET_SIZE, self.count - index)
+        for current in self._decode_bucket(bucket, stop):
+            if current >= key:
+                break
+            index += 1
+        return min(max(index, lo), hi)
+
+    def bisect_left(self, text: str) -> int:
+        """Returns the position of text, or where it would be inserted."""
+        return self._bisect(text.encode('utf-8'))
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Returns (start, stop) of the strings starting with prefix."""
+        key = prefix.encode('utf-8')
+        start = self._bisect(key)
+        # 0xFF never occurs in UTF-8, so key + 0xFF sorts after every string with that prefix.
+        return start, self._bisect(key + b'\xff', start)
+
+    def list_dir(self, prefix: str, sep: str = '\\') -> Tuple[List[Tuple[str, int]], List[str]]:
+        """
+        Lists one directory level below prefix (which should end with sep, or be empty).
+        Returns ([(subdirectory name, index of its first string)], [full strings of the files]).
+        Whole subtrees are skipped with a binary search, so the cost follows the number of children.
+        """
+        prefix_bytes = prefix.encode('utf-8')
+        sep_bytes = sep.encode('utf-8')
+        index, stop = self.prefix_range(prefix)
+        dirs = []
+        files = []
+        while index < stop:
+            current = self._get_bytes(index)
+            rest = current[len(prefix_bytes):]
+            sep_pos = rest.find(sep_bytes)
+            if sep_pos == -1:
+                files.append(current.decode('utf-8'))
+                index += 1
+                continue
+            child = rest[:sep_pos]
+            dirs.append((child.decode('utf-8'), index))
+            index = self._bisect(prefix_bytes + child + sep_bytes + b'\xff', index, stop)
+        return dirs, files